@@ -0,0 +1,105 @@
+/*
+ * Client-side histogram rebinning.
+ *
+ * Receives the sorted values of the selected (year, sex) from the
+ * "histogram-values" store and bins them for the selected width, so that
+ * changing the bin width needs no server round trip. Mirrors bin_values in
+ * src/utils/histogram_engine.py: integer edges, left-closed bins, each
+ * country counted once per bin.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    histogram: {
+        rebin: function (data, step) {
+            var valueTitle = (data && data.valueTitle) || "Value ranges";
+            if (!data || !data.values.length) {
+                return {
+                    data: [],
+                    layout: {
+                        title: "No data for this selection.",
+                        xaxis: {title: valueTitle},
+                        yaxis: {title: "Number of countries"},
+                        height: 420
+                    }
+                };
+            }
+            var unit = data.valueUnit ? " " + data.valueUnit : "";
+            var values = data.values, regions = data.regions,
+                countries = data.countries, names = data.regionNames;
+            var nRegions = names.length;
+
+            var low = Math.floor(values[0] / step) * step;
+            var high = Math.ceil(values[values.length - 1] / step) * step;
+            if (high <= low) {
+                high = low + step;
+            }
+            var nBins = (high - low) / step;
+            var labels = [], counts = [], regionCounts = [];
+            for (var b = 0; b < nBins; b++) {
+                labels.push((low + b * step) + "–" + (low + (b + 1) * step - 1));
+                counts.push(0);
+                regionCounts.push(new Array(nRegions).fill(0));
+            }
+
+            // Values are sorted, so bins are visited in order
+            var bin = 0, seen = new Set();
+            for (var i = 0; i < values.length; i++) {
+                var v = values[i];
+                if (v >= high) {
+                    break;
+                }
+                while (v >= low + (bin + 1) * step) {
+                    bin++;
+                    seen.clear();
+                }
+                if (countries) {
+                    if (seen.has(countries[i])) {
+                        continue;
+                    }
+                    seen.add(countries[i]);
+                }
+                counts[bin]++;
+                if (regions[i] >= 0) {
+                    regionCounts[bin][regions[i]]++;
+                }
+            }
+
+            var x = [], y = [], hover = [];
+            for (b = 0; b < nBins; b++) {
+                if (!counts[b]) {
+                    continue;
+                }
+                var lines = [labels[b] + unit, "Total: " + counts[b] + " countries", ""];
+                data.regionOrder.forEach(function (r) {
+                    var n = regionCounts[b][r];
+                    if (n > 0) {
+                        lines.push(names[r] + ": " + n + (n === 1 ? " country" : " countries"));
+                    }
+                });
+                x.push(labels[b]);
+                y.push(counts[b]);
+                hover.push(lines.join("<br>"));
+            }
+
+            return {
+                data: [{
+                    x: x,
+                    y: y,
+                    type: "bar",
+                    marker: {color: "#0078D4"},
+                    hovertext: hover,
+                    hoverinfo: "text"
+                }],
+                layout: {
+                    xaxis: {
+                        title: valueTitle,
+                        categoryorder: "array",
+                        categoryarray: labels
+                    },
+                    yaxis: {title: "Number of countries"},
+                    height: 420,
+                    margin: {l: 50, r: 30, t: 30, b: 60}
+                }
+            };
+        }
+    }
+});
@@ -0,0 +1,120 @@
+/*
+ * Map year playback.
+ *
+ * Plays the years of the current map selection without rendering one map
+ * per year: value frames are fetched in batches from the "map-frames"
+ * callback (the next batch is requested while the current one plays) and
+ * posted to the rendered map, whose RemoteValueLayer restyles the shapes
+ * (see src/components/map_layers.py). In the Plotly mode, the values and
+ * hover texts of the choropleth are restyled in place instead.
+ */
+(function () {
+    // Years ahead of the current one that must be loaded or requested
+    var PREFETCH = 3;
+    var PLAY = "▶ Play years";
+    var PAUSE = "⏸ Pause";
+    var frameCache = {};
+
+    function noUpdate(n) {
+        var result = [];
+        for (var i = 0; i < n; i++) {
+            result.push(window.dash_clientside.no_update);
+        }
+        return result;
+    }
+
+    function postFrame(frame) {
+        var iframe = document.getElementById("map-iframe");
+        if (iframe && iframe.contentWindow) {
+            iframe.contentWindow.postMessage({type: "map-frame", frame: frame}, "*");
+        }
+        restyleGraph(frame);
+    }
+
+    // Same values and texts as graph_values in src/components/map.py
+    function restyleGraph(frame) {
+        var graph = document.querySelector("#map-graph .js-plotly-plot");
+        if (!graph || !graph.data || !graph.data.length || !window.Plotly) {
+            return;
+        }
+        var trace = graph.data[0];
+        var z = [];
+        var text = [];
+        trace.locations.forEach(function (code, i) {
+            var entry = frame.values[code];
+            var name = (trace.customdata && trace.customdata[i]) || code;
+            z.push(entry ? entry[0] : null);
+            text.push(name + ": " + (entry ? entry[0].toFixed(1) : "no data"));
+        });
+        window.Plotly.restyle(graph, {z: [z], text: [text]}, [0]);
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        mapPlayback: {
+            toggle: function (nClicks, state, year, options) {
+                var years = (options || []).map(function (option) { return option.value; });
+                if (state && state.playing) {
+                    return [true, PLAY, Object.assign({}, state, {playing: false}),
+                            state.year === null ? window.dash_clientside.no_update : state.year];
+                }
+                var index = years.indexOf(year);
+                if (index < 0 || index >= years.length - 1) {
+                    index = 0;
+                }
+                return [false, PAUSE,
+                        {playing: true, years: years, index: index, year: null, requested: null},
+                        window.dash_clientside.no_update];
+            },
+
+            tick: function (nIntervals, frames, state, indicator, sex, spatialType) {
+                if (frames && frames.key) {
+                    var batch = frameCache[frames.key] = frameCache[frames.key] || {};
+                    frames.frames.forEach(function (frame, i) {
+                        batch[frames.start + i] = frame;
+                    });
+                }
+                if (!state || !state.playing) {
+                    return noUpdate(6);
+                }
+
+                var key = [indicator, sex, spatialType].join("|");
+                var cached = frameCache[key] || {};
+                var next = Object.assign({}, state);
+
+                // Request the first missing frame among the next ones
+                var request = window.dash_clientside.no_update;
+                var end = Math.min(state.index + PREFETCH, state.years.length);
+                for (var i = state.index; i < end; i++) {
+                    if (!cached[i]) {
+                        var requestId = key + ":" + i;
+                        if (state.requested !== requestId) {
+                            next.requested = requestId;
+                            request = {key: key, indicator: indicator, sex: sex,
+                                       spatialType: spatialType, start: i};
+                        }
+                        break;
+                    }
+                }
+
+                var triggered = window.dash_clientside.callback_context.triggered;
+                if (triggered.length && triggered[0].prop_id === "map-frames.data") {
+                    return [next, request].concat(noUpdate(4));
+                }
+
+                var frame = cached[state.index];
+                var year = state.years[state.index];
+                if (!frame) {
+                    return [next, request, "Loading " + year + "…"].concat(noUpdate(3));
+                }
+                postFrame(frame);
+                next.year = year;
+                next.index = state.index + 1;
+                if (next.index >= state.years.length) {
+                    next.playing = false;
+                    return [next, request, "", true, PLAY, year];
+                }
+                return [next, request, String(year)].concat(noUpdate(3));
+            }
+        }
+    });
+})();
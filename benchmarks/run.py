@@ -0,0 +1,255 @@
+"""
+Benchmark suite for the data pipeline and dashboard hot paths.
+
+Every benchmark runs on synthetic data scaled from the real raw and cleaned
+data (see benchmarks.synthetic). Results are written as JSON and compared
+with benchmarks/baselines.json: a benchmark slower than its baseline times
+its threshold is a regression and makes the run exit with status 1.
+
+Usage:
+    python -m benchmarks.run                      # scales 10 and 100
+    python -m benchmarks.run --scales 10 100 1000
+    python -m benchmarks.run --only create_map --repeat 5
+    python -m benchmarks.run --update-baseline    # record new baselines
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import (
+    scale_clean_data, synthetic_world_geojson, write_scaled_raw_data,
+)
+from config import DEFAULT_CSV, RAW_DATA_CSV
+from scripts.build_regional_geojson import create_who_regions_geojson
+from src.utils.clean_data import clean_data, export_feather
+from src.utils.aggregates import AggregateCube
+from src.utils.data_store import DataStore
+from src.utils.get_data import load_clean_data
+from src.utils.histogram_engine import bin_values, clear_cache, selection_slice
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+BASELINES_JSON = BENCHMARK_DIR / "baselines.json"
+
+DEFAULT_SCALES = [10, 100]
+DEFAULT_THRESHOLD = 1.5
+
+
+def _latest_selection(store):
+    """Returns the newest (year, sex) of a store."""
+    return store.years[-1], "Both"
+
+
+def bench_load_clean_data(scale, workdir):
+    """load_clean_data from the Feather artifact of the scaled data."""
+    csv_path, feather_path = workdir / "clean.csv", workdir / "clean.feather"
+    df = scale_clean_data(pd.read_csv(DEFAULT_CSV), scale)
+    df.to_csv(csv_path, index=False)
+    export_feather(df, feather_path)
+    return lambda: load_clean_data(csv_path, feather_path)
+
+
+def bench_load_clean_csv(scale, workdir):
+    """load_clean_data without a Feather artifact (CSV parsing)."""
+    csv_path = workdir / "clean.csv"
+    scale_clean_data(pd.read_csv(DEFAULT_CSV), scale).to_csv(csv_path, index=False)
+    return lambda: load_clean_data(csv_path, workdir / "missing.feather")
+
+
+def bench_clean_data(scale, workdir):
+    """clean_data on the scaled raw data (CSV and Feather outputs)."""
+    raw_path = workdir / "raw.csv"
+    write_scaled_raw_data(pd.read_csv(RAW_DATA_CSV), scale, raw_path)
+    return lambda: clean_data(raw_path, workdir / "clean.csv",
+                              feather_path=workdir / "clean.feather")
+
+
+def _store(scale):
+    """Returns a DataStore of the scaled cleaned data."""
+    return DataStore(scale_clean_data(pd.read_csv(DEFAULT_CSV), scale), f"bench-x{scale}")
+
+
+def bench_create_map(scale, workdir):
+    """create_map for the newest year, countries and regions."""
+    from src.components.map import create_map
+
+    store = _store(scale)
+    year, sex = _latest_selection(store)
+    levels = [[None, "/geometry/bench.geojson"]]
+
+    def run():
+        create_map(store, levels, year, sex, "COUNTRY")
+        create_map(store, levels, year, sex, "REGION")
+    return run
+
+
+def bench_update_histogram_values(scale, workdir):
+    """Server side of the histogram: values payload of an uncached (year, sex)."""
+    from src.components.histogram import histogram_values
+
+    store = _store(scale)
+    year, sex = _latest_selection(store)
+
+    def run():
+        clear_cache()
+        return histogram_values(store, year, sex)
+    return run
+
+
+def bench_bin_values(scale, workdir):
+    """Histogram bins and per-region counts for every bin width."""
+    store = _store(scale)
+    value_slice = selection_slice(store, *_latest_selection(store))
+
+    def run():
+        for step in (2, 5, 10):
+            bin_values(value_slice, step)
+    return run
+
+
+def bench_create_who_regions_geojson(scale, workdir):
+    """create_who_regions_geojson with scale polygons per country."""
+    world = synthetic_world_geojson(units=scale)
+    return lambda: create_who_regions_geojson(
+        max_workers=None, world_geojson=world, output_path=workdir / "regions.geojson"
+    )
+
+
+def bench_build_aggregates(scale, workdir):
+    """Year x sex x region aggregate cube of the whole table."""
+    df = _store(scale).df
+    return lambda: AggregateCube(df)
+
+
+def bench_update_aggregates(scale, workdir):
+    """Incremental cube update after the newest year's values changed."""
+    store = _store(scale)
+    year = store.years[-1]
+    df = store.df.copy()
+    changed = df["TimeDim"] == year
+    df.loc[changed, "NumericValue"] += 0.1
+    updated = DataStore(df, f"bench-x{scale}-updated")
+    rows = df[changed]
+    return lambda: store.aggregates.update(rows, updated)
+
+
+BENCHMARKS = {
+    "load_clean_data": bench_load_clean_data,
+    "load_clean_csv": bench_load_clean_csv,
+    "clean_data": bench_clean_data,
+    "create_map": bench_create_map,
+    "update_histogram_values": bench_update_histogram_values,
+    "bin_values": bench_bin_values,
+    "build_aggregates": bench_build_aggregates,
+    "update_aggregates": bench_update_aggregates,
+    "create_who_regions_geojson": bench_create_who_regions_geojson,
+}
+
+
+def run_benchmark(name, scale, repeat):
+    """
+    Runs one benchmark and returns the median of its timings.
+
+    Args:
+        name (str): Key of BENCHMARKS.
+        scale (int): Data scale factor.
+        repeat (int): Timed runs (after one warm-up run).
+
+    Returns:
+        float: Median duration in seconds.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        func = BENCHMARKS[name](scale, Path(tmp))
+        func()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def load_baselines(path=BASELINES_JSON) -> dict:
+    """Returns the stored baselines ({} if there are none)."""
+    if not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def find_regressions(results, baselines) -> list:
+    """
+    Compares results with baselines.
+
+    Args:
+        results (dict): {name: {scale: seconds}}.
+        baselines (dict): Content of baselines.json.
+
+    Returns:
+        list: (name, scale, seconds, baseline, threshold) of every regression.
+    """
+    thresholds = baselines.get("thresholds", {})
+    reference = baselines.get("results", {})
+    regressions = []
+    for name, by_scale in results.items():
+        threshold = thresholds.get(name, DEFAULT_THRESHOLD)
+        for scale, seconds in by_scale.items():
+            baseline = reference.get(name, {}).get(scale)
+            if baseline is not None and seconds > baseline * threshold:
+                regressions.append((name, scale, seconds, baseline, threshold))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store the results as the new baselines")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        for scale in args.scales:
+            seconds = run_benchmark(name, scale, args.repeat)
+            results.setdefault(name, {})[str(scale)] = seconds
+            print(f"{name:<28} x{scale:<5} {seconds * 1000:10.2f} ms", flush=True)
+
+    report = {
+        "machine": platform.platform(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    baselines = load_baselines()
+    if args.update_baseline:
+        merged = baselines.get("results", {})
+        for name, by_scale in results.items():
+            merged.setdefault(name, {}).update(by_scale)
+        baselines.update(machine=report["machine"], python=report["python"],
+                         results=merged)
+        baselines.setdefault("thresholds", {})
+        BASELINES_JSON.write_text(json.dumps(baselines, indent=2) + "\n",
+                                  encoding="utf-8")
+        return 0
+
+    regressions = find_regressions(results, baselines)
+    for name, scale, seconds, baseline, threshold in regressions:
+        print(f"REGRESSION {name} x{scale}: {seconds * 1000:.2f} ms "
+              f"> {threshold} x {baseline * 1000:.2f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Startup benchmark: time to first byte of a freshly started server.
+
+Starts the dashboard (Flask development server, no reloader) in a
+subprocess, polls '/' until it answers and reports the time from process
+start to the first successful response, then the duration of the first
+map page visit (data, boundaries and first render loaded lazily).
+The run fails when the time to first byte exceeds TTFB_TARGET.
+
+Usage: python -m benchmarks.startup [--port 8077] [--runs 3]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import requests
+
+from config import DEFAULT_CSV, DEFAULT_INDICATOR, ROOT
+
+# Documented target for the time to first byte of '/' (seconds)
+TTFB_TARGET = 2.0
+
+_SERVER = "import main; main.app.run(port={port}, debug=False)"
+
+# Values of the map page controls on a first visit
+_MAP_CONTROLS = {
+    "sex-radio": "Female",
+    "spatial-type-radio": "COUNTRY",
+    "indicator-dropdown": DEFAULT_INDICATOR,
+    "map-engine-radio": "folium",
+}
+
+
+def _callback_request(dependencies, output, values):
+    """
+    Returns the request of a callback, with its inputs as declared by the
+    app (so it follows the layout; a missing value raises a KeyError).
+
+    Args:
+        dependencies (list): Callbacks listed by '/_dash-dependencies'.
+        output (str): Output of the callback (e.g. 'map-iframe.srcDoc').
+        values (dict): Value of each input, by component id.
+    """
+    callback = next(cb for cb in dependencies if cb["output"] == output)
+    component, prop = output.split(".")
+    return {
+        "output": output,
+        "outputs": {"id": component, "property": prop},
+        "inputs": [{"id": dep["id"], "property": dep["property"], "value": values[dep["id"]]}
+                   for dep in callback["inputs"]],
+        "state": [{"id": dep["id"], "property": dep["property"], "value": values[dep["id"]]}
+                  for dep in callback.get("state", [])],
+        "changedPropIds": [],
+    }
+
+
+def measure_startup(port: int, timeout: float = 60) -> tuple:
+    """
+    Starts a server and measures its time to first byte and first map visit.
+
+    Args:
+        port (int): Port of the server.
+        timeout (float): Seconds to wait for the first response.
+
+    Returns:
+        tuple: (time to first byte, first map visit) in seconds.
+    """
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", _SERVER.format(port=port)], cwd=ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                if requests.get(url + "/", timeout=1).ok:
+                    break
+            except requests.ConnectionError:
+                pass
+            if time.perf_counter() - start > timeout or process.poll() is not None:
+                raise RuntimeError("The server did not start")
+            time.sleep(0.01)
+        ttfb = time.perf_counter() - start
+
+        year = int(pd.read_csv(DEFAULT_CSV, usecols=["TimeDim"])["TimeDim"].max())
+        visit = time.perf_counter()
+        dependencies = requests.get(url + "/_dash-dependencies", timeout=timeout)
+        dependencies.raise_for_status()
+        for output, values in (("page-content.children", {"url": "/map"}),
+                               ("map-iframe.srcDoc", {"year-dropdown": year, **_MAP_CONTROLS})):
+            requests.post(url + "/_dash-update-component",
+                          json=_callback_request(dependencies.json(), output, values),
+                          timeout=timeout).raise_for_status()
+        return ttfb, time.perf_counter() - visit
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8077)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    ttfbs, visits = zip(*(measure_startup(args.port) for _ in range(args.runs)))
+    ttfb = statistics.median(ttfbs)
+    print(f"time to first byte   {ttfb * 1000:8.0f} ms (target {TTFB_TARGET * 1000:.0f} ms)")
+    print(f"first map visit      {statistics.median(visits) * 1000:8.0f} ms")
+    return 0 if ttfb <= TTFB_TARGET else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Synthetic dataset generator for the benchmarks.
+
+Scales the real raw and cleaned data to N times their row count while
+keeping their schema, by adding extra years (blocks of years before the
+real range), extra indicators (raw data only, the cleaned schema has no
+indicator column) and sub-national units ('<ISO3>-<n>' codes of type
+COUNTRY that keep the region of their country). A matching synthetic
+world GeoJSON splits every country into as many unit polygons.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utils.regions import COUNTRY_REGION
+
+# Largest number of year blocks and indicators added before using units
+MAX_YEAR_BLOCKS = 10
+MAX_INDICATORS = 10
+
+
+def scale_factors(scale: int, with_indicators: bool = False) -> tuple:
+    """
+    Splits a scale factor into (year blocks, indicators, units).
+
+    Args:
+        scale (int): Requested row multiplier.
+        with_indicators (bool): Whether indicators can be multiplied.
+
+    Returns:
+        tuple: Three factors whose product is at least scale.
+    """
+    year_blocks = min(scale, MAX_YEAR_BLOCKS)
+    rest = -(-scale // year_blocks)
+    indicators = min(rest, MAX_INDICATORS) if with_indicators else 1
+    units = -(-rest // indicators)
+    return year_blocks, indicators, units
+
+
+def _replicate(df: pd.DataFrame, year_blocks: int, indicators: int,
+               units: int, blocks=None) -> tuple:
+    """
+    Returns df repeated once per (year block, indicator, unit), with the
+    indicator index of every output row. blocks selects some of the copies
+    (positions in that order; all if None).
+    """
+    n = len(df)
+    block = np.arange(year_blocks * indicators * units) if blocks is None else np.asarray(blocks)
+    copies = len(block)
+    year_block = np.repeat(block // (indicators * units), n)
+    indicator = np.repeat(block // units % indicators, n)
+    unit = np.repeat(block % units, n)
+
+    out = df.iloc[np.tile(np.arange(n), copies)].reset_index(drop=True)
+
+    years = out["TimeDim"].astype("int64")
+    span = int(years.max() - years.min() + 1)
+    out["TimeDim"] = years - span * year_block
+
+    codes = out["SpatialDim"].astype(str)
+    suffix = pd.Series(unit, index=out.index).map("-{:03d}".format)
+    is_unit = (unit > 0) & (out["SpatialDimType"] == "COUNTRY").to_numpy()
+    out["SpatialDim"] = codes.where(~is_unit, codes + suffix)
+    return out, indicator
+
+
+def scale_clean_data(df: pd.DataFrame, scale: int) -> pd.DataFrame:
+    """
+    Scales cleaned data (cleaneddata.csv schema) to about scale times its rows.
+
+    Args:
+        df (pd.DataFrame): Cleaned data.
+        scale (int): Row multiplier.
+
+    Returns:
+        pd.DataFrame: The synthetic cleaned data.
+    """
+    year_blocks, _, units = scale_factors(scale)
+    return _replicate(df, year_blocks, 1, units)[0]
+
+
+def scale_raw_data(df: pd.DataFrame, scale: int, blocks=None) -> pd.DataFrame:
+    """
+    Scales raw WHO data (rawdata.csv schema) to about scale times its rows.
+
+    Args:
+        df (pd.DataFrame): Raw data.
+        scale (int): Row multiplier.
+        blocks (iterable, optional): Copies to generate (all if None), see
+            write_scaled_raw_data.
+
+    Returns:
+        pd.DataFrame: The synthetic raw data, with unique Ids.
+    """
+    year_blocks, indicators, units = scale_factors(scale, with_indicators=True)
+    out, indicator = _replicate(df, year_blocks, indicators, units, blocks)
+
+    copies = len(out) // max(len(df), 1)
+    block = np.arange(copies) if blocks is None else np.asarray(blocks)
+    out["Id"] = (np.repeat(block, len(df)) * len(df)
+                 + np.tile(np.arange(len(df)), copies) + 1).astype(np.int64)
+    base = out["IndicatorCode"].astype(str)
+    out["IndicatorCode"] = base.where(indicator == 0, base + "_" + indicator.astype(str))
+    years = out["TimeDim"].astype(str)
+    out["TimeDimensionValue"] = years
+    out["TimeDimensionBegin"] = years + "-01-01T00:00:00+01:00"
+    out["TimeDimensionEnd"] = years + "-12-31T00:00:00+01:00"
+    return out
+
+
+def write_scaled_raw_data(df: pd.DataFrame, scale: int, path,
+                          copies_per_write: int = 10) -> None:
+    """
+    Writes scale_raw_data(df, scale) to a CSV file a few copies at a time,
+    so that the file can be larger than memory.
+
+    Args:
+        df (pd.DataFrame): Raw data.
+        scale (int): Row multiplier.
+        path (Path): Output CSV file.
+        copies_per_write (int): Copies generated per write.
+    """
+    copies = int(np.prod(scale_factors(scale, with_indicators=True)))
+    for start in range(0, copies, copies_per_write):
+        blocks = range(start, min(start + copies_per_write, copies))
+        scale_raw_data(df, scale, blocks).to_csv(
+            path, mode="w" if start == 0 else "a", header=start == 0, index=False
+        )
+
+
+def synthetic_world_geojson(units: int = 1) -> dict:
+    """
+    Returns a world GeoJSON with one square per country, laid out on a grid
+    by region, each split into units polygons (MultiPolygon). Unit polygons
+    are separated by a small gap so that every MultiPolygon is valid.
+
+    Args:
+        units (int): Polygons per country.
+
+    Returns:
+        dict: GeoJSON FeatureCollection with ISO-3 ids.
+    """
+    side = int(np.ceil(np.sqrt(units)))
+    step = 1.0 / side
+    size = 0.9 * step
+    features = []
+    countries = sorted(COUNTRY_REGION.items(), key=lambda item: (item[1], item[0]))
+    for index, (country, _) in enumerate(countries):
+        x0, y0 = index % 20, index // 20
+        polygons = []
+        for cell in range(units):
+            x = x0 + (cell % side) * step
+            y = y0 + (cell // side) * step
+            polygons.append([[[x, y], [x + size, y], [x + size, y + size],
+                              [x, y + size], [x, y]]])
+        features.append({
+            "type": "Feature",
+            "id": country,
+            "properties": {"name": country},
+            "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+        })
+    return {"type": "FeatureCollection", "features": features}
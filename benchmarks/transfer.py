@@ -0,0 +1,90 @@
+"""
+Transfer benchmark: bytes sent and server time of a typical page visit.
+
+Replays the requests of a first visit of the map and histogram pages
+(page shell, Dash bundles, layout, callbacks, geometry) against the app's
+Flask server, then replays them with the validators received (a repeat
+visit), and reports the bytes sent and the server time of each pass.
+
+Usage: python -m benchmarks.transfer [--encoding gzip|br|identity]
+"""
+
+import argparse
+import re
+import time
+
+from main import app
+from src.components.map import get_geometry_levels
+from src.utils.data_store import get_data_store
+
+
+def _callback(output, inputs):
+    component, prop = output.split(".")
+    return {
+        "output": output,
+        "outputs": {"id": component, "property": prop},
+        "inputs": [{"id": i, "property": p, "value": v} for i, p, v in inputs],
+        "changedPropIds": [],
+    }
+
+
+def visit_requests(client):
+    """Returns the (method, url, json) requests of a first map and histogram visit."""
+    year = get_data_store().years[-1]
+    page = client.get("/").get_data(as_text=True)
+    bundles = re.findall(r'src="(/_dash-component-suites/[^"]+)"', page)
+    requests_ = [("GET", "/", None)] + [("GET", url, None) for url in bundles]
+    requests_ += [("GET", "/_dash-layout", None), ("GET", "/_dash-dependencies", None)]
+    requests_.append(("POST", "/_dash-update-component", _callback(
+        "map-iframe.srcDoc",
+        [("year-dropdown", "value", year), ("sex-radio", "value", "Female"),
+         ("spatial-type-radio", "value", "COUNTRY"),
+         ("indicator-dropdown", "value", "WHOSIS_000001"),
+         ("map-engine-radio", "value", "folium")],
+    )))
+    requests_.append(("POST", "/_dash-update-component", _callback(
+        "histogram-values.data",
+        [("year-dropdown-hist", "value", year), ("sex-dropdown-hist", "value", "Both"),
+         ("indicator-dropdown-hist", "value", "WHOSIS_000001")],
+    )))
+    for levels in get_geometry_levels().values():
+        requests_ += [("GET", url, None) for _, url in levels[:1]]
+    return requests_
+
+
+def replay(client, requests_, encoding, etags=None):
+    """
+    Sends the requests and returns (bytes sent, seconds, ETag of each request).
+    """
+    total_bytes, total_time, received = 0, 0.0, []
+    for i, (method, url, body) in enumerate(requests_):
+        headers = {"Accept-Encoding": encoding}
+        if etags and etags[i]:
+            headers["If-None-Match"] = etags[i]
+        start = time.perf_counter()
+        response = client.open(url, method=method, json=body, headers=headers)
+        data = response.get_data()
+        total_time += time.perf_counter() - start
+        total_bytes += len(data)
+        received.append(response.headers.get("ETag"))
+    return total_bytes, total_time, received
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--encoding", default="gzip, deflate, br")
+    args = parser.parse_args(argv)
+
+    client = app.server.test_client()
+    requests_ = visit_requests(client)
+    replay(client, requests_, args.encoding)  # warm the caches
+
+    first_bytes, first_time, etags = replay(client, requests_, args.encoding)
+    repeat_bytes, repeat_time, _ = replay(client, requests_, args.encoding, etags)
+    print(f"{len(requests_)} requests, Accept-Encoding: {args.encoding}")
+    print(f"first visit   {first_bytes / 1024:10.1f} KiB {first_time * 1000:8.1f} ms")
+    print(f"repeat visit  {repeat_bytes / 1024:10.1f} KiB {repeat_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
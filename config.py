@@ -3,6 +3,7 @@ Configuration module for the Life Expectancy Dashboard application.
 Contains data file paths and external API URLs.
 """
 
+import os
 from pathlib import Path
 
 # Project root (where config.py is located)
@@ -16,7 +17,15 @@ CLEANED_DATA_DIR = DATA_DIR / "cleaned"
 # File paths (relative)
 RAW_DATA_CSV = RAW_DATA_DIR / "rawdata.csv"
 DEFAULT_CSV = CLEANED_DATA_DIR / "cleaneddata.csv"
+# Typed columnar copy of DEFAULT_CSV (uncompressed Arrow IPC, memory-mappable)
+CLEANED_FEATHER = CLEANED_DATA_DIR / "cleaneddata.feather"
 WHO_REGIONS_GEOJSON = DATA_DIR / "who_regions.geojson"
+GEOMETRY_DIR = DATA_DIR / "geometry"
+# Local, content-addressed copies of remote resources
+RESOURCE_CACHE_DIR = DATA_DIR / "cache"
+# Pre-rendered dashboard views (scripts/prerender_views.py) and their manifest
+VIEWS_DIR = DATA_DIR / "views"
+VIEWS_MANIFEST = VIEWS_DIR / "manifest.json"
 
 # External URLs
 WORLD_GEOJSON_URL = (
@@ -24,4 +33,93 @@ WORLD_GEOJSON_URL = (
     "/master/countries.geo.json"
 )
 
-URL = "https://ghoapi.azureedge.net/api/WHOSIS_000001"
+# WHO Global Health Observatory OData API
+GHO_API_URL = "https://ghoapi.azureedge.net/api"
+
+# Indicator registry: GHO code -> display name and unit. Each indicator is
+# ingested and cleaned into its own partition (see src.utils.indicators).
+INDICATORS = {
+    "WHOSIS_000001": {"name": "Life expectancy at birth", "unit": "years"},
+    "WHOSIS_000002": {"name": "Healthy life expectancy at birth", "unit": "years"},
+    "WHOSIS_000015": {"name": "Life expectancy at age 60", "unit": "years"},
+    "WHOSIS_000007": {"name": "Healthy life expectancy at age 60", "unit": "years"},
+    "MDG_0000000001": {"name": "Infant mortality rate", "unit": "per 1000 live births"},
+    "MDG_0000000007": {"name": "Under-five mortality rate", "unit": "per 1000 live births"},
+}
+# Indicator stored in RAW_DATA_CSV / DEFAULT_CSV and shown by default
+DEFAULT_INDICATOR = "WHOSIS_000001"
+
+URL = f"{GHO_API_URL}/{DEFAULT_INDICATOR}"
+
+# Concurrent indicator downloads: pooled connections, retries with
+# exponential backoff (0.5 s, 1 s, 2 s, ...) on connection errors and
+# 429/5xx responses
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_BACKOFF = 0.5
+
+# Simplified geometry levels: name -> (simplification tolerance, quantization
+# grid, highest map zoom served by the level or None). Tolerance and grid are
+# in degrees; levels are listed from coarsest to finest.
+GEOMETRY_LEVELS = {
+    "low": (0.2, 0.01, 3),
+    "medium": (0.05, 0.001, 5),
+    "high": (0.01, 0.0001, None),
+}
+
+# Map render cache
+MAP_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Number of most recent years pre-rendered at startup (0 disables warm-up)
+MAP_CACHE_WARM_YEARS = 2
+
+# Map engine shown by default: 'folium' (Leaflet map in an iframe) or
+# 'plotly' (dcc.Graph choropleth updated in place); the geometry level the
+# Plotly choropleth loads (a GEOMETRY_LEVELS key, full resolution if missing)
+MAP_ENGINE = "folium"
+MAP_GRAPH_GEOMETRY_LEVEL = "medium"
+
+# Map year playback: delay between frames, and years of value frames sent
+# per request (the next batch is prefetched while the current one plays)
+MAP_PLAYBACK_INTERVAL_MS = 800
+MAP_FRAME_BATCH = 6
+
+# Seconds between two checks, by a serving process, of the cleaned
+# partitions of its loaded data stores (changed ones are reloaded in the
+# background, see src.utils.data_store.register_data_refresh); 0 disables
+DATA_REFRESH_INTERVAL = 10
+
+# Shared callback result cache (SQLite file used by every worker; None disables)
+RESULT_CACHE_PATH = RESOURCE_CACHE_DIR / "results.sqlite"
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESULT_CACHE_TTL = 24 * 3600  # seconds
+# Hits only update the access times used by the LRU eviction in batches,
+# at most every RESULT_CACHE_ACCESS_FLUSH seconds (and on every store)
+RESULT_CACHE_ACCESS_FLUSH = 60  # seconds
+
+# HTTP response compression (brotli when installed, gzip otherwise); bodies
+# smaller than COMPRESSION_MIN_BYTES are sent as is
+COMPRESSION_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSION_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Pre-rendered views: build worker processes (None = CPU count)
+PRERENDER_WORKERS = None
+
+# Read-only data export API (CSV, JSON Lines, Arrow), streamed in chunks
+EXPORT_ROUTE = "/api/data"
+EXPORT_CHUNK_ROWS = 10_000
+
+# Prometheus metrics route (DASHBOARD_METRICS=0 disables instrumentation)
+METRICS_ENABLED = os.environ.get("DASHBOARD_METRICS", "1") != "0"
+METRICS_ROUTE = "/metrics"
+
+# Production server (gunicorn.conf.py), overridable with environment variables
+SERVER_BIND = os.environ.get("DASHBOARD_BIND", "0.0.0.0:8050")
+SERVER_WORKERS = int(os.environ.get("DASHBOARD_WORKERS", (os.cpu_count() or 1) + 1))
+SERVER_THREADS = int(os.environ.get("DASHBOARD_THREADS", 4))
+# Workers are recycled after this many requests (+ random jitter); 0 disables
+SERVER_MAX_REQUESTS = int(os.environ.get("DASHBOARD_MAX_REQUESTS", 2000))
+SERVER_MAX_REQUESTS_JITTER = int(os.environ.get("DASHBOARD_MAX_REQUESTS_JITTER", 200))
+SERVER_TIMEOUT = int(os.environ.get("DASHBOARD_TIMEOUT", 60))
+SERVER_GRACEFUL_TIMEOUT = int(os.environ.get("DASHBOARD_GRACEFUL_TIMEOUT", 30))
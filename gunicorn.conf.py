@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for the Life Expectancy Dashboard.
+
+The app is preloaded in the master (see wsgi.py) before the workers are
+forked. Worker and thread counts, request-based recycling and timeouts
+come from config.py and can be overridden with DASHBOARD_* environment
+variables.
+
+Usage: gunicorn -c gunicorn.conf.py wsgi:server
+"""
+
+from config import (
+    SERVER_BIND,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_MAX_REQUESTS,
+    SERVER_MAX_REQUESTS_JITTER,
+    SERVER_THREADS,
+    SERVER_TIMEOUT,
+    SERVER_WORKERS,
+    WORLD_GEOJSON_URL,
+)
+
+bind = SERVER_BIND
+workers = SERVER_WORKERS
+threads = SERVER_THREADS
+preload_app = True
+
+# Graceful worker recycling
+max_requests = SERVER_MAX_REQUESTS
+max_requests_jitter = SERVER_MAX_REQUESTS_JITTER
+timeout = SERVER_TIMEOUT
+graceful_timeout = SERVER_GRACEFUL_TIMEOUT
+
+
+def when_ready(server):  # pylint: disable=unused-argument
+    """Revalidates the cached remote resources once the master is ready."""
+    from src.utils.resource_cache import revalidate_in_background  # pylint: disable=import-outside-toplevel
+    revalidate_in_background([WORLD_GEOJSON_URL])
@@ -4,6 +4,7 @@ Main module for the Life Expectancy Dashboard application.
 
 # Standard library imports
 import sys
+import threading
 from pathlib import Path
 
 # Third party imports
@@ -11,36 +12,63 @@ from dash import Dash, dcc, html, Input, Output
 import dash_bootstrap_components as dbc
 
 # Local application imports
-from scripts.build_regional_geojson import create_who_regions_geojson
+from config import CLEANED_FEATHER, GEOMETRY_DIR, WHO_REGIONS_GEOJSON, WORLD_GEOJSON_URL
 from src.utils.get_data import download_raw_data
 from src.utils.get_data import check_all_resources_available
-from src.utils.clean_data import clean_data
+from src.utils.get_data import load_clean_csv
+from src.utils.resource_cache import revalidate_in_background
 
 if not check_all_resources_available():
     print("Erreur : certaines ressources externes indispensables ne sont pas accessibles.")
     sys.exit(1)  # Quitte le programme avec un code d'erreur non nul
 
-# Download and clean data only if necessary
+# Download and clean data only if necessary. Build-time modules (shapely,
+# cleaning) are imported only here, so they stay out of a normal startup.
 if not Path('data/raw/rawdata.csv').exists():
     download_raw_data()
 
 if not Path('data/cleaned/cleaneddata.csv').exists():
+    from src.utils.clean_data import clean_data
     clean_data()
+elif not CLEANED_FEATHER.exists():
+    from src.utils.clean_data import export_feather
+    export_feather(load_clean_csv())
 
-if not Path('data/raw/who_regions.geojson').exists():
+if not WHO_REGIONS_GEOJSON.exists():
+    from scripts.build_regional_geojson import create_who_regions_geojson
     create_who_regions_geojson()
 
-# Local application imports 2
+if not GEOMETRY_DIR.exists():
+    from scripts.build_regional_geojson import create_geometry_levels
+    create_geometry_levels()
+
+# Local application imports 2 (page modules register their callbacks here;
+# their data is loaded on the first visit or by warm_pages)
 from src.pages.home import page_layout as home_layout
 from src.components.map import layout as map_layout
+from src.components.map import warm_map_cache
 from src.components.histogram import layout as histogram_layout
 from src.pages.about import page_layout as about_layout
+from src.utils.data_store import register_data_refresh
+from src.utils.export import register_export_routes
+from src.utils.geometry import register_geometry_routes
+from src.utils.http_cache import register_http_caching
+from src.utils.metrics import register_metrics_routes
 
 
 # Application configuration
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP],
            suppress_callback_exceptions=True)
 app.title = "Life Expectancy Dashboard"
+register_data_refresh(app.server)
+register_geometry_routes(app.server)
+register_export_routes(app.server)
+# after_request hooks run in reverse order: metrics see uncompressed responses
+register_http_caching(app.server)
+register_metrics_routes(app.server, app.callback_map)
+
+# WSGI application (see wsgi.py for the production entry point)
+server = app.server
 
 app.layout = html.Div([
     dcc.Location(id="url"),
@@ -71,12 +99,33 @@ def display_page(pathname):
         dash component: The layout corresponding to the selected page.
     """
     if pathname == "/map":
-        return map_layout
+        return map_layout()
     if pathname == "/histogram":
-        return histogram_layout
+        return histogram_layout()
     if pathname == "/about":
-        return about_layout
+        return about_layout()
     return home_layout
 
+def warm_pages():
+    """
+    Loads the data, boundaries and most recent maps ahead of the first visit.
+    """
+    warm_map_cache()
+    histogram_layout()
+    about_layout()
+
+def warm_pages_in_background() -> threading.Thread:
+    """
+    Starts warm_pages in a daemon thread, so the server binds immediately.
+
+    Returns:
+        threading.Thread: The started thread.
+    """
+    thread = threading.Thread(target=warm_pages, name="page-warmup", daemon=True)
+    thread.start()
+    return thread
+
 if __name__ == "__main__":
+    revalidate_in_background([WORLD_GEOJSON_URL])
+    warm_pages_in_background()
     app.run(debug=True)
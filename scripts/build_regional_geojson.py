@@ -1,94 +1,79 @@
 """
 Script to create WHO regions GeoJSON file.
-Generates a GeoJSON file containing WHO region boundaries.
+Generates a GeoJSON file containing WHO region boundaries, and the
+simplified, quantized geometry levels served to the map.
 """
 
 import json
-import urllib.request
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import shapely
 from shapely.geometry import shape, mapping
 from shapely.ops import unary_union
 
-WHO_REGIONS = {
-    'AFR': {
-        'name': 'Africa',
-        'countries': ['DZA', 'AGO', 'BEN', 'BWA', 'BFA', 'BDI', 'CMR', 'CPV',
-                      'CAF', 'TCD', 'COM', 'COG', 'CIV', 'COD', 'GNQ', 'ERI',
-                      'ETH', 'GAB', 'GMB', 'GHA', 'GIN', 'GNB', 'KEN', 'LSO',
-                      'LBR', 'MDG', 'MWI', 'MLI', 'MRT', 'MUS', 'MOZ', 'NAM',
-                      'NER', 'NGA', 'RWA', 'STP', 'SEN', 'SYC', 'SLE', 'ZAF',
-                      'SSD', 'SWZ', 'TGO', 'UGA', 'TZA', 'ZMB', 'ZWE', 'MAR',
-                      'SOM', 'SDN','EGY','LBY', 'TUN', 'DJI']
-    },
-    'AMR': {
-        'name': 'Americas',
-        'countries': ['ATG', 'ARG', 'BHS', 'BRB', 'BLZ', 'BOL', 'BRA', 'CAN',
-                      'CHL', 'COL', 'CRI', 'CUB', 'DMA', 'DOM', 'ECU', 'SLV',
-                      'GRD', 'GTM', 'GUY', 'HTI', 'HND', 'JAM', 'MEX', 'NIC',
-                      'PAN', 'PRY', 'PER', 'KNA', 'LCA', 'VCT', 'SUR', 'TTO',
-                      'USA', 'URY', 'VEN','GUF']
-    },
-    'SEAR': {
-        'name': 'South-East Asia',
-        'countries': ['BGD', 'BTN', 'IND', 'IDN', 'MDV', 'MMR', 'NPL',
-                      'LKA', 'THA', 'TLS','MYS']
-    },
-    'EUR': {
-        'name': 'Europe',
-        'countries': ['ALB', 'AND', 'ARM', 'AUT', 'AZE', 'BLR', 'BEL', 'BIH',
-                      'BGR', 'HRV', 'CYP', 'CZE', 'DNK', 'EST', 'FIN', 'FRA',
-                      'GEO', 'DEU', 'GRC', 'HUN', 'ISL', 'IRL', 'ITA',
-                      'KAZ', 'KGZ', 'LVA', 'LTU', 'LUX', 'MLT', 'MCO', 'MNE',
-                      'NLD', 'MKD', 'NOR', 'POL', 'PRT', 'MDA', 'ROU', 'RUS',
-                      'SMR', 'SRB', 'SVK', 'SVN', 'ESP', 'SWE', 'CHE', 'TJK',
-                      'TUR', 'TKM', 'UKR', 'GBR', 'UZB','RS-KM']
-    },
-    'EMR': {
-        'name': 'Eastern Mediterranean',
-        'countries': ['AFG', 'BHR', 'IRN', 'IRQ', 'JOR', 'KWT',
-                      'LBN', 'OMN', 'PAK', 'PSE', 'QAT', 'SAU',
-                      'SYR', 'ARE', 'YEM','ISR']
-    },
-    'WPR': {
-        'name': 'Western Pacific',
-        'countries': ['AUS', 'BRN', 'KHM', 'CHN', 'COK', 'FJI', 'JPN', 'KIR',
-                      'LAO', 'MHL', 'FSM', 'MNG', 'NRU', 'NZL', 'NIU',
-                      'PLW', 'PNG', 'PHL', 'KOR','PRK','WSM', 'SGP', 'SLB', 'TON',
-                      'TUV', 'VUT', 'VNM']
-    }
-}
+from config import GEOMETRY_DIR, GEOMETRY_LEVELS, WHO_REGIONS_GEOJSON
+from src.utils.get_data import load_world_geojson
+from src.utils.regions import WHO_REGIONS
+
+def _union_region(geometries):
+    """Merges the GeoJSON geometries of one region (process pool worker)."""
+    return mapping(unary_union([shape(geometry) for geometry in geometries]))
 
-def create_who_regions_geojson():
+
+def create_who_regions_geojson(max_workers=0, world_geojson=None,
+                               output_path=WHO_REGIONS_GEOJSON):
     """
     Creates a GeoJSON file with WHO regions by merging country geometries.
-    """
-    # Load world countries GeoJSON
-    url = (
-        "https://raw.githubusercontent.com/johan/world.geo.json"
-        "/master/countries.geo.json"
-    )
-    with urllib.request.urlopen(url, timeout=15) as response:
-        world_geojson = json.load(response)
 
-    # Create regions GeoJSON
-    regions_features = []
-
-    for region_code, region_info in WHO_REGIONS.items():
-        region_countries = region_info['countries']
-        region_geometries = []
+    The world GeoJSON comes from the local resource cache, features are
+    indexed by id once, and the per-region unions run in this process or,
+    from an entry point guarded by `if __name__ == '__main__'`, in a process
+    pool (workers started with spawn or forkserver re-import the main module,
+    so the app, which builds the file at import time, must not use one).
 
-        for feature in world_geojson['features']:
-            if feature.get('id') in region_countries:
-                geom = shape(feature['geometry'])
-                region_geometries.append(geom)
+    Args:
+        max_workers (int, optional): Worker processes; 0 runs the unions in
+            this process, None uses one worker per CPU (default: 0).
+        world_geojson (dict, optional): Country geometries (default: the
+            cached world GeoJSON).
+        output_path (Path): Output GeoJSON file.
+    """
+    # Load world countries GeoJSON and index it by ISO-3 code
+    if world_geojson is None:
+        world_geojson = load_world_geojson()
+    geometries_by_id = {
+        feature.get('id'): feature['geometry']
+        for feature in world_geojson['features']
+    }
 
+    # Geometries of each region, in WHO_REGIONS order
+    regions = []
+    for region_code, region_info in WHO_REGIONS.items():
+        region_geometries = [
+            geometries_by_id[country]
+            for country in region_info['countries']
+            if country in geometries_by_id
+        ]
         if region_geometries:
-            merged_geom = unary_union(region_geometries)
-            regions_features.append({
-                'type': 'Feature',
-                'id': region_code,
-                'properties': {'name': region_info['name']},
-                'geometry': mapping(merged_geom)
-            })
+            regions.append((region_code, region_info['name'], region_geometries))
+
+    # Create regions GeoJSON
+    region_geometries = [geometries for _, _, geometries in regions]
+    if max_workers == 0:
+        merged = [_union_region(geometries) for geometries in region_geometries]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            merged = list(executor.map(_union_region, region_geometries))
+    regions_features = [
+        {
+            'type': 'Feature',
+            'id': region_code,
+            'properties': {'name': name},
+            'geometry': geometry
+        }
+        for (region_code, name, _), geometry in zip(regions, merged)
+    ]
 
     regions_geojson = {
         'type': 'FeatureCollection',
@@ -96,5 +81,72 @@ def create_who_regions_geojson():
     }
 
     # Save to file
-    with open('data/who_regions.geojson', 'w', encoding='utf-8') as file:
-        json.dump(regions_geojson, file, indent=2)
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(regions_geojson, file, separators=(',', ':'))
+
+
+def _round_coordinates(coordinates, ndigits):
+    """Recursively rounds nested GeoJSON coordinates to ndigits decimals."""
+    if isinstance(coordinates[0], (int, float)):
+        return [round(value, ndigits) for value in coordinates]
+    return [_round_coordinates(part, ndigits) for part in coordinates]
+
+
+def write_geometry_levels(name, geojson, output_dir=GEOMETRY_DIR):
+    """
+    Writes simplified, coordinate-quantized variants of a FeatureCollection.
+
+    All features are simplified together as a polygonal coverage, so borders
+    shared by neighbouring features are simplified identically and stay
+    watertight. Coordinates are then snapped to the level's grid. One compact
+    file '<name>.<level>.geojson' is written per entry of GEOMETRY_LEVELS.
+
+    Args:
+        name (str): Base name of the output files (e.g. 'countries').
+        geojson (dict): Source GeoJSON FeatureCollection.
+        output_dir (Path): Directory receiving the files.
+    """
+    features = geojson['features']
+    geometries = [shape(feature['geometry']) for feature in features]
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for level, (tolerance, grid, _) in GEOMETRY_LEVELS.items():
+        simplified = shapely.coverage_simplify(geometries, tolerance)
+        quantized = shapely.set_precision(simplified, grid)
+        ndigits = max(0, -math.floor(math.log10(grid)))
+
+        level_features = []
+        for feature, geom in zip(features, quantized):
+            if geom.is_empty:
+                continue
+            geometry = mapping(geom)
+            level_features.append({
+                'type': 'Feature',
+                'id': feature.get('id'),
+                'properties': {'name': feature.get('properties', {}).get('name')},
+                'geometry': {
+                    'type': geometry['type'],
+                    'coordinates': _round_coordinates(geometry['coordinates'], ndigits)
+                }
+            })
+
+        output_path = output_dir / f"{name}.{level}.geojson"
+        with open(output_path, 'w', encoding='utf-8') as file:
+            json.dump({'type': 'FeatureCollection', 'features': level_features},
+                      file, separators=(',', ':'))
+
+
+def create_geometry_levels():
+    """
+    Creates the simplified geometry levels for countries and WHO regions.
+    """
+    write_geometry_levels('countries', load_world_geojson())
+
+    with open(WHO_REGIONS_GEOJSON, 'r', encoding='utf-8') as file:
+        regions_geojson = json.load(file)
+    write_geometry_levels('regions', regions_geojson)
+
+
+if __name__ == '__main__':
+    create_who_regions_geojson(max_workers=None)
+    create_geometry_levels()
@@ -0,0 +1,84 @@
+"""
+Script comparing the startup cost of the cleaned-data formats.
+
+Loads the cleaned data into a DataStore from the CSV file and from the
+memory-mapped Feather file, each in a fresh interpreter, and reports the
+load time and the resident memory split into anonymous (private) and
+file-backed (shareable between workers) pages. RSS figures are read from
+/proc and are only available on Linux.
+
+Usage: python -m scripts.compare_data_formats
+"""
+
+import json
+import subprocess
+import sys
+
+from config import ROOT
+
+_PROBE = """
+import json, time
+from src.utils import get_data
+from src.utils.data_store import DataStore
+
+def rss():
+    fields = {}
+    try:
+        with open("/proc/self/status", encoding="utf-8") as file:
+            for line in file:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    fields[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return fields
+
+before = rss()
+start = time.perf_counter()
+df = get_data.load_clean___FORMAT__()
+store = DataStore(df, "probe")
+elapsed = time.perf_counter() - start
+after = rss()
+print(json.dumps({
+    "seconds": elapsed,
+    "rows": len(store.df),
+    "rss_kb": {key: after.get(key, 0) - before.get(key, 0) for key in after},
+}))
+"""
+
+
+def measure(fmt: str, repeat: int = 5) -> dict:
+    """
+    Measures loading one format in fresh interpreters.
+
+    Args:
+        fmt (str): 'csv' or 'feather'.
+        repeat (int): Number of runs; the fastest is kept.
+
+    Returns:
+        dict: Load time in seconds, row count and RSS deltas in KB.
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.replace("__FORMAT__", fmt)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json.loads(output))
+    return min(runs, key=lambda run: run["seconds"])
+
+
+def main():
+    """Prints the comparison table."""
+    print(f"{'format':<8} {'load (ms)':>10} {'rows':>8} "
+          f"{'RSS (KB)':>9} {'anon (KB)':>10} {'file (KB)':>10}")
+    for fmt in ("csv", "feather"):
+        result = measure(fmt)
+        rss = result["rss_kb"]
+        print(f"{fmt:<8} {result['seconds'] * 1000:>10.1f} {result['rows']:>8} "
+              f"{rss.get('VmRSS', 0):>9} {rss.get('RssAnon', 0):>10} "
+              f"{rss.get('RssFile', 0):>10}")
+
+
+if __name__ == "__main__":
+    main()
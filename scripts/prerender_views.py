@@ -0,0 +1,207 @@
+"""
+Script to pre-render every dashboard view.
+
+Renders, in a process pool, every map (year x sex x spatial type, as
+Folium HTML) and every histogram values payload (year x sex, as JSON; the
+page bins them in the browser) of the available indicators into
+content-hashed files under VIEWS_DIR, and writes VIEWS_MANIFEST, from
+which the app serves them (see src.utils.views).
+
+Each view is fingerprinted from its inputs: the values of its selection,
+the published geometry and the source of its renderer. Views whose
+fingerprint did not change since the last build are kept as they are;
+files no longer listed in the manifest are removed. Every view records
+the versions of the inputs it was built from, so views of indicators not
+rebuilt stay valid only while their renderer and geometry are unchanged.
+
+Usage: python -m scripts.prerender_views [--workers N] [--indicators CODE ...] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import PRERENDER_WORKERS, VIEWS_DIR, VIEWS_MANIFEST
+from src.components.histogram import histogram_values
+from src.components.map import (
+    create_map, get_geometry_levels, sex_codes_avail_raw, spatial_types,
+)
+from src.utils.data_store import get_data_store
+from src.utils.indicators import available_indicators, indicator_name
+from src.utils.views import (
+    RENDERER_SOURCES, geometry_version, load_manifest, renderer_version, view_key,
+)
+
+# View kind -> (renderer, file extension)
+VIEW_KINDS = {
+    "map": ("map", ".html"),
+    "histogram-values": ("histogram", ".json"),
+}
+
+
+def _digest(*parts) -> str:
+    """Returns a short SHA-256 digest of bytes or JSON-serializable parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, default=str).encode("utf-8")
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+def list_views(indicators) -> list:
+    """
+    Lists every view of some indicators with the fingerprint of its inputs.
+
+    Args:
+        indicators (list): Indicator codes.
+
+    Returns:
+        list: (key, fingerprint, versions, task) tuples; versions are those
+            of the view inputs (see src.utils.views.prerendered_view) and
+            task is the argument of render_view.
+    """
+    geometry = get_geometry_levels()
+    sources = {renderer: renderer_version(renderer) for renderer in RENDERER_SOURCES}
+    views = []
+    for indicator in indicators:
+        store = get_data_store(indicator)
+        name = indicator_name(indicator)
+        data = {f"data:{indicator}": store.version}
+        for year in store.years:
+            for sex in sex_codes_avail_raw:
+                for spatial_type in spatial_types:
+                    values = sorted(store.value_map(year, sex, spatial_type).items())
+                    views.append((
+                        view_key("map", indicator, year, sex, spatial_type),
+                        _digest(sources["map"], name, geometry[spatial_type], values),
+                        {**data,
+                         f"geometry:{spatial_type}": geometry_version(geometry[spatial_type]),
+                         "renderer:map": sources["map"]},
+                        ("map", indicator, year, sex, spatial_type),
+                    ))
+                payload = histogram_values(store, year, sex, indicator)
+                views.append((
+                    view_key("histogram-values", indicator, year, sex),
+                    _digest(sources["histogram"], payload),
+                    {**data, "renderer:histogram": sources["histogram"]},
+                    ("histogram-values", indicator, year, sex),
+                ))
+    return views
+
+
+def render_view(task) -> str:
+    """
+    Renders one view (process pool worker).
+
+    Args:
+        task (tuple): (kind, indicator, year, sex[, spatial type]).
+
+    Returns:
+        str: Map HTML or histogram values JSON.
+    """
+    kind, indicator, year, sex, *params = task
+    store = get_data_store(indicator)
+    if kind == "map":
+        spatial_type, = params
+        return create_map(store, get_geometry_levels()[spatial_type], year, sex,
+                          spatial_type, indicator)
+    return json.dumps(histogram_values(store, year, sex, indicator), separators=(",", ":"))
+
+
+def _write_view(output_dir, kind, content: str) -> str:
+    """Writes a view under its content hash and returns its manifest path."""
+    data = content.encode("utf-8")
+    name = f"{kind}/{hashlib.sha256(data).hexdigest()[:16]}{VIEW_KINDS[kind][1]}"
+    path = output_dir / name
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    return name
+
+
+def _remove_unlisted(output_dir, files) -> int:
+    """Removes view files not listed in files; returns how many were removed."""
+    removed = 0
+    for directory in output_dir.glob("*/"):
+        for path in directory.glob("*"):
+            if f"{directory.name}/{path.name}" not in files:
+                path.unlink()
+                removed += 1
+    return removed
+
+
+def prerender_views(indicators=None, max_workers=PRERENDER_WORKERS, force=False,
+                    output_dir=VIEWS_DIR, manifest_path=VIEWS_MANIFEST) -> dict:
+    """
+    Renders the views whose inputs changed since the last build and writes
+    the manifest.
+
+    Args:
+        indicators (list, optional): Indicator codes (default: all available).
+        max_workers (int, optional): Worker processes (default: CPU count).
+        force (bool): Re-render every view.
+        output_dir (Path): Directory of the view files.
+        manifest_path (Path): Manifest file.
+
+    Returns:
+        dict: Number of 'rendered', 'reused' and 'removed' views.
+    """
+    indicators = list(indicators or available_indicators())
+    previous = load_manifest(manifest_path)
+    # Views of the indicators not rebuilt are kept with the versions they
+    # were built from (they are ignored once their inputs change)
+    entries = {key: entry for key, entry in previous.get("views", {}).items()
+               if key.split("/")[1] not in indicators}
+
+    todo = []
+    for key, inputs, versions, task in list_views(indicators):
+        entry = previous.get("views", {}).get(key)
+        if (not force and entry is not None and entry["inputs"] == inputs
+                and (output_dir / entry["file"]).is_file()):
+            entries[key] = {**entry, "versions": versions}
+        else:
+            todo.append((key, inputs, versions, task))
+
+    if todo:
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            contents = executor.map(render_view, [task for *_, task in todo],
+                                    chunksize=max(1, len(todo) // (workers * 4)))
+            for (key, inputs, versions, task), content in zip(todo, contents):
+                entries[key] = {"file": _write_view(output_dir, task[0], content),
+                                "inputs": inputs, "versions": versions}
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps({"views": entries}, indent=1),
+                        encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+
+    removed = _remove_unlisted(output_dir, {entry["file"] for entry in entries.values()})
+    return {"rendered": len(todo), "reused": len(entries) - len(todo), "removed": removed}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=PRERENDER_WORKERS)
+    parser.add_argument("--indicators", nargs="+", choices=available_indicators())
+    parser.add_argument("--force", action="store_true", help="re-render every view")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = prerender_views(args.indicators, args.workers, args.force)
+    print(f"{counts['rendered']} views rendered, {counts['reused']} unchanged, "
+          f"{counts['removed']} files removed in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,71 +1,105 @@
 """
 Histogram visualization module.
-Displays the distribution of countries by life expectancy ranges.
+Displays the distribution of countries by value ranges of an indicator.
 """
 
-import math
-import pandas as pd
+import json
+from functools import lru_cache
+
 import plotly.io as pio
 import dash_bootstrap_components as dbc
-from dash import dcc, html, Input, Output, callback
-from scripts.build_regional_geojson import WHO_REGIONS
-from src.utils.get_data import load_clean_data
-
-df = load_clean_data()
-
-# Extract available years
-years = sorted(df["TimeDim"].dropna().unique().tolist())
-
-layout = dbc.Container(
-    [
-        html.H2("Number of countries by life expectancy range"),
-        dbc.Row(
-            [
-                dbc.Col(
-                    dcc.Dropdown(
-                        id="year-dropdown-hist",
-                        options=[{"label": year, "value": year} for year in years],
-                        value=years[-1] if years else None,
-                        clearable=False,
-                        style={"width": "220px"},
+from dash import ClientsideFunction, clientside_callback, dcc, html, Input, Output, State, callback
+from config import DEFAULT_INDICATOR
+from src.utils.regions import REGION_NAMES
+from src.utils.data_store import get_data_store
+from src.utils.indicators import indicator_name, indicator_options, indicator_unit
+from src.utils.histogram_engine import build_value_slice, cache_stats, selection_slice
+from src.utils.metrics import register_cache
+from src.utils.result_cache import shared_result
+from src.utils.views import prerendered_view, renderer_version, view_key
+
+register_cache("histogram_slices", cache_stats)
+
+# Region indices in hover order (alphabetical by name)
+REGIONS_BY_NAME = sorted(range(len(REGION_NAMES)), key=REGION_NAMES.__getitem__)
+
+# Bin widths offered by the page (in the unit of the indicator)
+BIN_WIDTHS = (2, 5, 10)
+
+
+def histogram_title(indicator: str) -> str:
+    """Returns the page title for an indicator."""
+    return f"Number of countries by {indicator_name(indicator).lower()} range"
+
+
+def bin_width_options(indicator: str) -> list:
+    """Returns the bin width options, labelled in the unit of an indicator."""
+    unit = indicator_unit(indicator)
+    return [{"label": f"{width} {unit}".strip(), "value": width} for width in BIN_WIDTHS]
+
+
+@lru_cache(maxsize=1)
+def layout():
+    """Returns the page layout, built on the first visit."""
+    years = get_data_store().years
+    return dbc.Container(
+        [
+            html.H2(histogram_title(DEFAULT_INDICATOR), id="histogram-title"),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id="indicator-dropdown-hist",
+                            options=indicator_options(),
+                            value=DEFAULT_INDICATOR,
+                            clearable=False,
+                            style={"width": "320px"},
+                        ),
+                        md="auto",
                     ),
-                    md="auto",
-                ),
-                dbc.Col(
-                    dcc.Dropdown(
-                        id="sex-dropdown-hist",
-                        options=[
-                            {"label": "Both sexes", "value": "Both"},
-                            {"label": "Female", "value": "Female"},
-                            {"label": "Male", "value": "Male"},
-                        ],
-                        value="Both",
-                        clearable=False,
-                        style={"width": "220px"},
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id="year-dropdown-hist",
+                            options=[{"label": year, "value": year} for year in years],
+                            value=years[-1] if years else None,
+                            clearable=False,
+                            style={"width": "220px"},
+                        ),
+                        md="auto",
                     ),
-                    md="auto",
-                ),
-                dbc.Col(
-                    dcc.Dropdown(
-                        id="bin-width",
-                        options=[
-                            {"label": "2 years", "value": 2},
-                            {"label": "5 years", "value": 5},
-                            {"label": "10 years", "value": 10},
-                        ],
-                        value=5,
-                        clearable=False,
-                        style={"width": "160px"},
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id="sex-dropdown-hist",
+                            options=[
+                                {"label": "Both sexes", "value": "Both"},
+                                {"label": "Female", "value": "Female"},
+                                {"label": "Male", "value": "Male"},
+                            ],
+                            value="Both",
+                            clearable=False,
+                            style={"width": "220px"},
+                        ),
+                        md="auto",
                     ),
-                    md="auto",
-                ),
-            ],
-            className="g-2 mb-3",
-        ),
-        dcc.Graph(id="histogram"),
-    ],
-    style={"marginTop": "2rem"},
-)
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id="bin-width",
+                            options=bin_width_options(DEFAULT_INDICATOR),
+                            value=5,
+                            clearable=False,
+                            style={"width": "160px"},
+                        ),
+                        md="auto",
+                    ),
+                ],
+                className="g-2 mb-3",
+            ),
+            dcc.Store(id="histogram-values"),
+            dcc.Graph(id="histogram"),
+        ],
+        style={"marginTop": "2rem"},
+    )
+
 
 # Global template (once in app startup)
 pio.templates["app_light"] = pio.templates["simple_white"].update({
@@ -81,112 +115,100 @@ pio.templates["app_light"] = pio.templates["simple_white"].update({
 pio.templates.default = "app_light"
 
 
-@callback(
+def values_version(selected_year, selected_sex, indicator=DEFAULT_INDICATOR) -> str:
+    """
+    Version of a histogram-values payload: the loaded data of its indicator
+    and the renderer source.
+    """
+    return f"{get_data_store(indicator).version}+{renderer_version('histogram')}"
+
+
+# Rebinning, counts and hover texts are computed in the browser
+# (assets/histogram.js) from the vectors of the selected (year, sex).
+clientside_callback(
+    ClientsideFunction(namespace="histogram", function_name="rebin"),
     Output("histogram", "figure"),
-    Input("year-dropdown-hist", "value"),
-    Input("sex-dropdown-hist", "value"),
+    Input("histogram-values", "data"),
     Input("bin-width", "value"),
 )
-def update_histogram(selected_year, selected_sex, step):
+
+
+@callback(
+    Output("year-dropdown-hist", "options"),
+    Output("year-dropdown-hist", "value"),
+    Output("histogram-title", "children"),
+    Output("bin-width", "options"),
+    Input("indicator-dropdown-hist", "value"),
+    State("year-dropdown-hist", "value"),
+)
+def update_year_options(indicator, selected_year):
     """
-    Updates the histogram based on the selected year, sex and bin width.
+    Lists the years of the selected indicator, keeping the year if possible,
+    and labels the title and bin widths after it.
     """
-    # --- Filter by year ---
-    d = df.copy() if selected_year is None else df[df["TimeDim"] == selected_year].copy()
+    years = get_data_store(indicator).years
+    value = selected_year if selected_year in years else years[-1]
+    return ([{"label": year, "value": year} for year in years], value,
+            histogram_title(indicator), bin_width_options(indicator))
 
-    # --- Filter by sex ---
-    if selected_sex:
-        d = d[d["Dim1"] == selected_sex].copy()
-
-    # --- Build dynamic bins from data range ---
-    vals = pd.to_numeric(d["NumericValue"], errors="coerce").dropna()
-    if vals.empty:
-        return _empty_fig("No data for this selection.")
-
-    vmin, vmax = float(vals.min()), float(vals.max())
-    low = int(math.floor(vmin / step) * step)
-    high = int(math.ceil(vmax / step) * step)
-    if high <= low:
-        high = low + step
-
-    bins = list(range(low, high + step, step))
-    labels = [f"{bins[i]}–{bins[i+1]-1}" for i in range(len(bins) - 1)]
-
-    d["age_bin"] = pd.cut(
-        vals,
-        bins=bins,
-        labels=labels,
-        right=False,
-        include_lowest=True,
+
+@callback(
+    Output("histogram-values", "data"),
+    Input("year-dropdown-hist", "value"),
+    Input("sex-dropdown-hist", "value"),
+    Input("indicator-dropdown-hist", "value"),
+)
+@shared_result("histogram.update_histogram_values", values_version)
+def update_histogram_values(selected_year, selected_sex, indicator=DEFAULT_INDICATOR):
+    """
+    Ships the sorted values of the selected year, sex and indicator to the
+    browser.
+
+    Returns:
+        dict: Sorted values, aligned region indices (-1 if none), aligned
+            country ids (None when each country appears once), region names,
+            the hover order of regions, the value axis title and unit.
+    """
+    store = get_data_store(indicator)
+    prerendered = prerendered_view(
+        view_key("histogram-values", indicator, selected_year, selected_sex),
+        {f"data:{indicator}": store.version,
+         "renderer:histogram": renderer_version("histogram")},
     )
+    if prerendered is not None:
+        return json.loads(prerendered)
+    return histogram_values(store, selected_year, selected_sex, indicator)
 
-    # --- Counts per bin ---
-    country_counts = d.groupby("age_bin", observed=True)["SpatialDim"].nunique()
-    country_names = d.groupby("age_bin", observed=True)["SpatialDim"].unique()
-
-    # Per-region details (for hover)
-    region_counts_by_age = build_region_counts(country_names)
-    hover_texts = create_hover_texts(country_counts, region_counts_by_age)
-
-    # --- Figure ---
-    fig = {
-        "data": [
-            {
-                "x": country_counts.index.astype(str),
-                "y": country_counts.values,
-                "type": "bar",
-                "marker": {"color": "#0078D4"},
-                "hovertext": hover_texts,
-                "hoverinfo": "text",
-            }
-        ],
-        "layout": {
-            "xaxis": {
-                "title": "Life expectancy ranges (years)",
-                "categoryorder": "array",
-                "categoryarray": labels,
-            },
-            "yaxis": {"title": "Number of countries"},
-            "height": 420,
-            "margin": {"l": 50, "r": 30, "t": 30, "b": 60},
-        },
-    }
-    return fig
-
-
-def build_region_counts(country_names):
-    """Builds a dictionary of region counts per age bin."""
-    region_counts = {}
-    for age_bin, countries in country_names.items():
-        region_counts[age_bin] = {}
-        for region_info in WHO_REGIONS.values():
-            count = sum(1 for country in countries if country in region_info["countries"])
-            if count > 0:
-                region_counts[age_bin][region_info["name"]] = count
-    return region_counts
-
-
-def create_hover_texts(country_counts, region_counts_by_age):
-    """Creates hover text for each bar with region breakdown."""
-    hover_texts = []
-    for age_bin in country_counts.index:
-        lines = [f"{age_bin} years", f"Total: {country_counts[age_bin]} countries", ""]
-        region_data = region_counts_by_age.get(age_bin, {})
-        for region_name in sorted(region_data.keys()):
-            count = region_data[region_name]
-            plural = "country" if count == 1 else "countries"
-            lines.append(f"{region_name}: {count} {plural}")
-        hover_texts.append("<br>".join(lines))
-    return hover_texts
-
-
-def _empty_fig(msg: str):
+
+def histogram_values(store, selected_year, selected_sex, indicator=DEFAULT_INDICATOR):
+    """Returns the histogram-values payload of a selection (see update_histogram_values)."""
+    if selected_year is not None and selected_sex:
+        value_slice = selection_slice(store, selected_year, selected_sex)
+    else:
+        value_slice = _filtered_slice(store, selected_year, selected_sex)
+
+    countries = value_slice.countries
     return {
-        "data": [],
-        "layout": {
-            "title": msg,
-            "xaxis": {"title": "Life expectancy ranges (years)"},
-            "yaxis": {"title": "Number of countries"},
-            "height": 420,
-        },
+        "values": value_slice.values.tolist(),
+        "regions": value_slice.regions.tolist(),
+        "countries": None if countries is None else countries.tolist(),
+        "regionNames": list(REGION_NAMES),
+        "regionOrder": REGIONS_BY_NAME,
+        "valueTitle": f"{indicator_name(indicator)} ranges ({indicator_unit(indicator)})",
+        "valueUnit": indicator_unit(indicator),
     }
+
+
+def _filtered_slice(store, selected_year, selected_sex):
+    """Sorted values of a selection with an unset year or sex (not memoized)."""
+    d = store.df
+    if selected_year is not None:
+        d = d[d["TimeDim"] == selected_year]
+    if selected_sex:
+        d = d[d["Dim1"] == selected_sex]
+    return build_value_slice(
+        d["NumericValue"].to_numpy(),
+        d["RegionCode"].cat.codes.to_numpy(),
+        d["SpatialDim"].to_numpy(),
+    )
+
@@ -1,134 +1,556 @@
 """
 Map page module - Choropleth map with controls and callbacks.
+
+Two map engines are available: a Folium (Leaflet) map rendered as an
+HTML document in an iframe, and a Plotly choropleth in a dcc.Graph whose
+boundaries are loaded once and whose year and sex changes are sent as
+dash.Patch updates of the values and hover texts only.
 """
 
-from dash import dcc, html, Output, Input, callback
+from functools import lru_cache
+
+from dash import (
+    ClientsideFunction, Patch, clientside_callback, ctx, dcc, html, no_update,
+    Output, Input, State, callback,
+)
 import dash_bootstrap_components as dbc
 import folium
+import numpy as np
+import plotly.graph_objects as go
+from branca.colormap import StepColormap
+from branca.utilities import color_brewer
+from config import (
+    DEFAULT_INDICATOR, MAP_CACHE_MAX_BYTES, MAP_CACHE_WARM_YEARS, MAP_ENGINE,
+    MAP_FRAME_BATCH, MAP_GRAPH_GEOMETRY_LEVEL, MAP_PLAYBACK_INTERVAL_MS,
+)
+from src.utils.data_store import get_data_store
 from src.utils.get_data import (
-    load_clean_data,
+    load_geometry_levels,
     load_world_geojson,
     load_who_regions_geojson
 )
+from src.components.map_layers import RemoteValueLayer
+from src.utils.geometry import publish_geometry_levels, published_geometry
+from src.utils.indicators import indicator_name, indicator_options
+from src.utils.metrics import register_cache
+from src.utils.render_cache import ByteLRUCache
+from src.utils.result_cache import shared_result
+from src.utils.views import geometry_version, prerendered_view, renderer_version, view_key
 
-# Load data
-DATA_DF = load_clean_data()
-world_gj = load_world_geojson()
-regions_gj = load_who_regions_geojson()
-
-years = sorted(DATA_DF["TimeDim"].dropna().unique().tolist())
 sex_codes_avail_raw = ['Female', 'Both', 'Male']
+spatial_types = ['COUNTRY', 'REGION']
+map_engines = ['folium', 'plotly']
+
+# Inputs that change the shapes of the Plotly choropleth (a full figure is
+# sent); other changes are sent as a Patch of its values
+GRAPH_FIGURE_INPUTS = {"spatial-type-radio", "indicator-dropdown", "map-engine-radio"}
+
+_HIDDEN = {"display": "none"}
+
+# Rendered map HTML keyed by (year, sex, spatial type, data version)
+MAP_CACHE = ByteLRUCache(MAP_CACHE_MAX_BYTES)
+register_cache("map_render", MAP_CACHE.stats)
+
+
+# Data and boundaries are loaded on the first visit of the page (or when
+# the cache is warmed), not when the module is imported.
+@lru_cache(maxsize=None)
+def get_geometry_levels() -> dict:
+    """
+    Publishes the boundaries as static, content-hashed assets, one per
+    simplification level (full resolution if levels are not built).
+
+    Returns:
+        dict: [max_zoom, url] pairs per spatial type.
+    """
+    return {
+        "COUNTRY": publish_geometry_levels(
+            "countries",
+            load_geometry_levels("countries") or [("full", None, load_world_geojson())]
+        ),
+        "REGION": publish_geometry_levels(
+            "regions",
+            load_geometry_levels("regions") or [("full", None, load_who_regions_geojson())]
+        ),
+    }
+
+
+def map_version(indicator: str, spatial_type: str) -> str:
+    """
+    Version of the maps of an indicator and spatial type: the loaded data,
+    the published geometry they reference and the renderer source.
+    """
+    return "+".join((
+        get_data_store(indicator).version,
+        geometry_version(get_geometry_levels()[spatial_type]),
+        renderer_version("map"),
+    ))
+
+
+def map_title(indicator: str) -> str:
+    """Returns the page title for an indicator."""
+    return f"{indicator_name(indicator)} — world choropleth"
+
+
+@lru_cache(maxsize=1)
+def layout():
+    """Returns the page layout, built on the first visit."""
+    years = get_data_store().years
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col([
+                html.H1(map_title(DEFAULT_INDICATOR), id="map-title"),
+                html.Label("Indicator"),
+                dcc.Dropdown(
+                    id="indicator-dropdown",
+                    options=indicator_options(),
+                    value=DEFAULT_INDICATOR,
+                    clearable=False
+                ),
+                html.Br(),
+                html.Label("Year"),
+                dcc.Dropdown(
+                    id="year-dropdown",
+                    options=[{"label": y, "value": y} for y in years],
+                    value=years[-1]
+                ),
+                html.Br(),
+                html.Label("Sex"),
+                dcc.RadioItems(
+                    id="sex-radio",
+                    options=[{"label": s, "value": s} for s in sex_codes_avail_raw],
+                    value="Female"
+                ),
+                html.Br(),
+                html.Label("Display by"),
+                dcc.RadioItems(
+                    id="spatial-type-radio",
+                    options=[
+                        {"label": "Country", "value": "COUNTRY"},
+                        {"label": "Region", "value": "REGION"}
+                    ],
+                    value="COUNTRY"
+                ),
+                html.Br(),
+                html.Label("Map engine"),
+                dcc.RadioItems(
+                    id="map-engine-radio",
+                    options=[
+                        {"label": "Leaflet (Folium)", "value": "folium"},
+                        {"label": "Plotly", "value": "plotly"}
+                    ],
+                    value=MAP_ENGINE
+                ),
+                html.Br(),
+                dbc.Button("▶ Play years", id="map-play-button", n_clicks=0,
+                           color="primary", outline=True, size="sm"),
+                html.Span(id="map-playback-year", className="ms-2 fw-bold"),
+                dcc.Interval(id="map-playback-interval",
+                             interval=MAP_PLAYBACK_INTERVAL_MS, disabled=True),
+                dcc.Store(id="map-playback"),
+                dcc.Store(id="map-frames-request"),
+                dcc.Store(id="map-frames")
+            ], md=3),
+            dbc.Col([
+                html.Iframe(
+                    id="map-iframe",
+                    style=_iframe_style(MAP_ENGINE)
+                ),
+                dcc.Graph(
+                    id="map-graph",
+                    config={"displaylogo": False},
+                    style=_graph_style(MAP_ENGINE)
+                )
+            ], md=9)
+        ])
+    ], fluid=True, style={"marginTop": "2rem"})
+
+
+def _iframe_style(engine):
+    style = {"width": "100%", "height": "600px", "border": "1px solid #ccc"}
+    return style if engine == "folium" else _HIDDEN
 
-# Page layout
-layout = dbc.Container([
-    dbc.Row([
-        dbc.Col([
-            html.H1("Life expectancy at birth — world choropleth"),
-            html.Label("Year"),
-            dcc.Dropdown(
-                id="year-dropdown",
-                options=[{"label": y, "value": y} for y in years],
-                value=years[-1]
-            ),
-            html.Br(),
-            html.Label("Sex"),
-            dcc.RadioItems(
-                id="sex-radio",
-                options=[{"label": s, "value": s} for s in sex_codes_avail_raw],
-                value="Female"
-            ),
-            html.Br(),
-            html.Label("Display by"),
-            dcc.RadioItems(
-                id="spatial-type-radio",
-                options=[
-                    {"label": "Country", "value": "COUNTRY"},
-                    {"label": "Region", "value": "REGION"}
-                ],
-                value="COUNTRY"
-            )
-        ], md=3),
-        dbc.Col([
-            html.Iframe(
-                id="map-iframe",
-                style={"width": "100%", "height": "600px",
-                       "border": "1px solid #ccc"}
-            )
-        ], md=9)
-    ])
-], fluid=True, style={"marginTop": "2rem"})
-
-def create_map(data_df, geojson, selected_year, selected_sex,
-               spatial_type='COUNTRY'):
+
+def _graph_style(engine):
+    return {"height": "600px"} if engine == "plotly" else _HIDDEN
+
+
+def create_map(store, geometry_levels, selected_year, selected_sex,
+               spatial_type='COUNTRY', indicator=DEFAULT_INDICATOR):
     """
     Generates a Folium choropleth map with hover tooltip.
 
+    The boundaries are not embedded: the map fetches the static geometry
+    asset matching the current zoom and only carries the selection values.
+
     Args:
-        data_df (pd.DataFrame): DataFrame containing life expectancy data
-        geojson (dict): GeoJSON (countries or regions)
+        store (DataStore): Indexed life expectancy data
+        geometry_levels (list): [max_zoom, url] pairs of the published geometry
         selected_year (int): Selected year
         selected_sex (str): Selected sex ('Male', 'Female', 'Both')
         spatial_type (str): 'COUNTRY' or 'REGION'
+        indicator (str): GHO indicator code of the store's data
 
     Returns:
         str: Folium map HTML
     """
-    # Filter data
-    subset = data_df[
-        (data_df["TimeDim"] == selected_year) &
-        (data_df["Dim1"] == selected_sex) &
-        (data_df["SpatialDimType"] == spatial_type)
-    ].copy()
-
-    life_exp_dict = dict(zip(subset["SpatialDim"], subset["NumericValue"]))
-
-    # Add values to GeoJSON
-    for feature in geojson['features']:
-        feature_id = feature.get('id')
-        if feature_id and feature_id in life_exp_dict:
-            feature['properties']['life_expectancy'] = life_exp_dict[feature_id]
-        else:
-            feature['properties']['life_expectancy'] = None
+    life_exp_dict = store.value_map(selected_year, selected_sex, spatial_type)
 
     # Create map
     map_obj = folium.Map(location=[20, 0], zoom_start=2,
                          tiles="cartodb positron")
 
-    folium.Choropleth(
-        geo_data=geojson,
-        data=subset,
-        columns=["SpatialDim", "NumericValue"],
-        key_on="feature.id",
-        fill_color="YlOrRd",
-        fill_opacity=0.7,
-        line_opacity=0.3,
-        legend_name=f"Life Expectancy at Birth ({selected_year}, {selected_sex})",
-        nan_fill_color="lightgray"
-    ).add_to(map_obj)
-
-    # Add tooltip
-    folium.GeoJson(
-        geojson,
-        style_function=lambda x: {'fillColor': 'transparent',
-                                  'color': 'transparent'},
-        tooltip=folium.GeoJsonTooltip(
-            fields=['name', 'life_expectancy'],
-            aliases=['Name:', 'Life Expectancy:'],
-            localize=True
-        )
-    ).add_to(map_obj)
+    values = {}
+    if life_exp_dict:
+        colormap = _colormap(life_exp_dict, selected_year, selected_sex, indicator)
+        values = {
+            code: [round(value, 3), colormap.rgb_hex_str(value)]
+            for code, value in life_exp_dict.items()
+        }
+        colormap.add_to(map_obj)
+
+    RemoteValueLayer(geometry_levels, values,
+                     value_label=f"{indicator_name(indicator)}:").add_to(map_obj)
 
     # pylint: disable=protected-access
     return map_obj._repr_html_()
 
+def _colormap(life_exp_dict, selected_year, selected_sex, indicator):
+    """Colour scale of a selection: 6 equal-width YlOrRd bins over its values."""
+    vmin, vmax = min(life_exp_dict.values()), max(life_exp_dict.values())
+    return StepColormap(
+        color_brewer("YlOrRd", 6),
+        index=np.linspace(vmin, vmax, 7).tolist(),
+        vmin=vmin,
+        vmax=vmax,
+        caption=f"{indicator_name(indicator)} ({selected_year}, {selected_sex})"
+    )
+
+def create_frame(store, selected_year, selected_sex, spatial_type='COUNTRY',
+                 indicator=DEFAULT_INDICATOR):
+    """
+    Returns the values of one year as a playback frame for a rendered map.
+
+    Colours are those create_map would use for the same selection; each
+    value carries the index of its colour in the frame palette.
+
+    Args:
+        store (DataStore): Indexed life expectancy data
+        selected_year (int): Year of the frame
+        selected_sex (str): Selected sex ('Male', 'Female', 'Both')
+        spatial_type (str): 'COUNTRY' or 'REGION'
+        indicator (str): GHO indicator code of the store's data
+
+    Returns:
+        dict: year, caption, bin edges, palette and {id: [value, colour index]}
+    """
+    life_exp_dict = store.value_map(selected_year, selected_sex, spatial_type)
+    frame = {"year": selected_year, "caption": "", "index": [], "colors": [], "values": {}}
+    if not life_exp_dict:
+        return frame
+
+    colormap = _colormap(life_exp_dict, selected_year, selected_sex, indicator)
+    edges = colormap.index
+    palette = [colormap.rgb_hex_str((low + high) / 2) for low, high in zip(edges, edges[1:])]
+    color_index = {color: i for i, color in reversed(list(enumerate(palette)))}
+    frame.update(
+        caption=colormap.caption,
+        index=[round(edge, 2) for edge in edges],
+        colors=palette,
+        values={
+            code: [round(value, 3), color_index[colormap.rgb_hex_str(value)]]
+            for code, value in life_exp_dict.items()
+        },
+    )
+    return frame
+
+def get_graph_geometry(spatial_type) -> str:
+    """
+    Returns the URL of the boundaries loaded by the Plotly choropleth
+    (MAP_GRAPH_GEOMETRY_LEVEL, or the finest published level).
+    """
+    levels = get_geometry_levels()[spatial_type]
+    for _, url in levels:
+        if f"-{MAP_GRAPH_GEOMETRY_LEVEL}." in url:
+            return url
+    return levels[-1][1]
+
+
+@lru_cache(maxsize=None)
+def _geometry_names(url) -> dict:
+    """Returns {feature id: display name} of published boundaries."""
+    return {feature.id: feature.name for feature in published_geometry(url).features}
+
+
+@lru_cache(maxsize=None)
+def _graph_locations(indicator, spatial_type, version) -> tuple:
+    """
+    Returns every SpatialDim of a spatial type over all years, so that the
+    choropleth keeps the same locations (and only its values change) from
+    one year or sex to another.
+    """
+    df = get_data_store(indicator).df
+    codes = df.loc[df["SpatialDimType"] == spatial_type, "SpatialDim"].unique()
+    return tuple(sorted(str(code) for code in codes))
+
+
+def graph_values(store, locations, names, selected_year, selected_sex, spatial_type):
+    """
+    Returns the values and hover texts of a selection, in locations order.
+
+    Args:
+        store (DataStore): Indexed life expectancy data
+        locations (tuple): Location ids of the choropleth
+        names (dict): Display name of each location id
+        selected_year (int): Selected year
+        selected_sex (str): Selected sex ('Male', 'Female', 'Both')
+        spatial_type (str): 'COUNTRY' or 'REGION'
+
+    Returns:
+        tuple: (z values, None where there is no data; hover texts)
+    """
+    life_exp_dict = store.value_map(selected_year, selected_sex, spatial_type)
+    z, text = [], []
+    for code in locations:
+        value = life_exp_dict.get(code)
+        name = names.get(code) or code
+        z.append(None if value is None else round(value, 3))
+        text.append(f"{name}: no data" if value is None else f"{name}: {value:.1f}")
+    return z, text
+
+
+def create_figure(store, geometry_url, selected_year, selected_sex,
+                  spatial_type='COUNTRY', indicator=DEFAULT_INDICATOR):
+    """
+    Generates a Plotly choropleth of a selection.
+
+    The boundaries are referenced by URL (the static geometry asset), so
+    the browser loads them once. The colour scale has the 6 equal-width
+    YlOrRd steps of the Folium map, spread over the values of the selection.
+
+    Args:
+        store (DataStore): Indexed life expectancy data
+        geometry_url (str): URL of the published geometry
+        selected_year (int): Selected year
+        selected_sex (str): Selected sex ('Male', 'Female', 'Both')
+        spatial_type (str): 'COUNTRY' or 'REGION'
+        indicator (str): GHO indicator code of the store's data
+
+    Returns:
+        go.Figure: The choropleth figure
+    """
+    names = _geometry_names(geometry_url)
+    locations = _graph_locations(indicator, spatial_type, store.version)
+    z, text = graph_values(store, locations, names, selected_year, selected_sex,
+                           spatial_type)
+    colors = color_brewer("YlOrRd", 6)
+    colorscale = [[bound, color] for i, color in enumerate(colors)
+                  for bound in (i / len(colors), (i + 1) / len(colors))]
+
+    figure = go.Figure(go.Choropleth(
+        geojson=geometry_url,
+        featureidkey="id",
+        locations=list(locations),
+        z=z,
+        text=text,
+        customdata=[names.get(code) or code for code in locations],
+        hoverinfo="text",
+        colorscale=colorscale,
+        marker_line_width=0.3,
+        marker_line_color="white",
+        colorbar_title_text=indicator_name(indicator),
+    ))
+    figure.update_geos(showframe=False, showcoastlines=False, showcountries=False,
+                       projection_type="natural earth")
+    figure.update_layout(margin={"l": 0, "r": 0, "t": 0, "b": 0},
+                         uirevision=f"{indicator}|{spatial_type}")
+    return figure
+
+
+def patch_figure(store, geometry_url, selected_year, selected_sex,
+                 spatial_type='COUNTRY', indicator=DEFAULT_INDICATOR) -> Patch:
+    """
+    Returns a Patch replacing only the values and hover texts of a figure
+    made by create_figure for the same spatial type and indicator.
+    """
+    locations = _graph_locations(indicator, spatial_type, store.version)
+    z, text = graph_values(store, locations, _geometry_names(geometry_url),
+                           selected_year, selected_sex, spatial_type)
+    patch = Patch()
+    patch["data"][0]["z"] = z
+    patch["data"][0]["text"] = text
+    return patch
+
+
+@callback(
+    Output("year-dropdown", "options"),
+    Output("year-dropdown", "value"),
+    Output("map-title", "children"),
+    Input("indicator-dropdown", "value"),
+    State("year-dropdown", "value")
+)
+def update_year_options(indicator, selected_year):
+    """
+    Lists the years of the selected indicator, keeping the year if possible,
+    and titles the page after it.
+    """
+    years = get_data_store(indicator).years
+    value = selected_year if selected_year in years else years[-1]
+    return [{"label": y, "value": y} for y in years], value, map_title(indicator)
+
+@callback(
+    Output("map-iframe", "style"),
+    Output("map-graph", "style"),
+    Input("map-engine-radio", "value")
+)
+def update_map_engine(engine):
+    """Shows the map of the selected engine."""
+    return _iframe_style(engine), _graph_style(engine)
+
 @callback(
     Output("map-iframe", "srcDoc"),
     Input("year-dropdown", "value"),
     Input("sex-radio", "value"),
-    Input("spatial-type-radio", "value")
+    Input("spatial-type-radio", "value"),
+    Input("indicator-dropdown", "value"),
+    Input("map-engine-radio", "value")
+)
+def update_map(selected_year, selected_sex, spatial_type, indicator, engine=MAP_ENGINE):
+    """Updates the Folium map based on user selection (not in the Plotly mode)."""
+    if engine != "folium":
+        return no_update
+    return shared_map_html(selected_year, selected_sex, spatial_type, indicator)
+
+@shared_result("map.update_map",
+               lambda year, sex, spatial_type, indicator: map_version(indicator, spatial_type))
+def shared_map_html(selected_year, selected_sex, spatial_type, indicator):
+    """Returns the Folium map HTML of a selection through the shared result cache."""
+    return render_map(selected_year, selected_sex, spatial_type, indicator)
+
+@callback(
+    Output("map-graph", "figure"),
+    Input("year-dropdown", "value"),
+    Input("sex-radio", "value"),
+    Input("spatial-type-radio", "value"),
+    Input("indicator-dropdown", "value"),
+    Input("map-engine-radio", "value")
 )
-def update_map(selected_year, selected_sex, spatial_type):
-    """Updates the map based on user selection."""
-    geojson = world_gj if spatial_type == "COUNTRY" else regions_gj
-    return create_map(DATA_DF, geojson, selected_year, selected_sex,
-                      spatial_type)
+def update_graph(selected_year, selected_sex, spatial_type, indicator, engine=MAP_ENGINE):
+    """
+    Updates the Plotly choropleth: a full figure when the shapes change
+    (first display, spatial type, indicator), otherwise a Patch of its values.
+    """
+    if engine != "plotly":
+        return no_update
+    store = get_data_store(indicator)
+    geometry_url = get_graph_geometry(spatial_type)
+    triggered = set(ctx.triggered_prop_ids.values())
+    if triggered and not triggered & GRAPH_FIGURE_INPUTS:
+        return patch_figure(store, geometry_url, selected_year, selected_sex,
+                            spatial_type, indicator)
+    return create_figure(store, geometry_url, selected_year, selected_sex,
+                         spatial_type, indicator)
+
+@callback(
+    Output("map-frames", "data"),
+    Input("map-frames-request", "data"),
+    prevent_initial_call=True
+)
+@shared_result("map.update_map_frames",
+               lambda request: map_version(request["indicator"], request["spatialType"]))
+def update_map_frames(request):
+    """
+    Returns a batch of playback frames (MAP_FRAME_BATCH years from request['start']).
+
+    Args:
+        request (dict): indicator, sex, spatialType and start (year index)
+
+    Returns:
+        dict: key of the selection, start index and the frames
+    """
+    store = get_data_store(request["indicator"])
+    start = request["start"]
+    return {
+        "key": request["key"],
+        "start": start,
+        "frames": [
+            create_frame(store, year, request["sex"], request["spatialType"],
+                         request["indicator"])
+            for year in store.years[start:start + MAP_FRAME_BATCH]
+        ],
+    }
+
+# Playback runs in the browser (assets/map_playback.js): it posts the value
+# frames to the rendered map instead of rendering one map per year.
+clientside_callback(
+    ClientsideFunction(namespace="mapPlayback", function_name="toggle"),
+    Output("map-playback-interval", "disabled"),
+    Output("map-play-button", "children"),
+    Output("map-playback", "data"),
+    Output("year-dropdown", "value", allow_duplicate=True),
+    Input("map-play-button", "n_clicks"),
+    State("map-playback", "data"),
+    State("year-dropdown", "value"),
+    State("year-dropdown", "options"),
+    prevent_initial_call=True
+)
+
+clientside_callback(
+    ClientsideFunction(namespace="mapPlayback", function_name="tick"),
+    Output("map-playback", "data", allow_duplicate=True),
+    Output("map-frames-request", "data"),
+    Output("map-playback-year", "children"),
+    Output("map-playback-interval", "disabled", allow_duplicate=True),
+    Output("map-play-button", "children", allow_duplicate=True),
+    Output("year-dropdown", "value", allow_duplicate=True),
+    Input("map-playback-interval", "n_intervals"),
+    Input("map-frames", "data"),
+    State("map-playback", "data"),
+    State("indicator-dropdown", "value"),
+    State("sex-radio", "value"),
+    State("spatial-type-radio", "value"),
+    prevent_initial_call=True
+)
+
+def render_map(selected_year, selected_sex, spatial_type, indicator=DEFAULT_INDICATOR):
+    """
+    Returns the map HTML for a selection, served from MAP_CACHE or the
+    pre-rendered views when possible.
+
+    Args:
+        selected_year (int): Selected year
+        selected_sex (str): Selected sex ('Male', 'Female', 'Both')
+        spatial_type (str): 'COUNTRY' or 'REGION'
+        indicator (str): GHO indicator code
+
+    Returns:
+        str: Folium map HTML
+    """
+    store = get_data_store(indicator)
+    # Also publishes the geometry assets referenced by pre-rendered maps
+    geometry_levels = get_geometry_levels()[spatial_type]
+    key = (selected_year, selected_sex, spatial_type, indicator, store.version)
+    return MAP_CACHE.get_or_compute(
+        key,
+        lambda: prerendered_view(
+            view_key("map", indicator, selected_year, selected_sex, spatial_type),
+            {f"data:{indicator}": store.version,
+             f"geometry:{spatial_type}": geometry_version(geometry_levels),
+             "renderer:map": renderer_version("map")},
+        ) or create_map(store, geometry_levels, selected_year, selected_sex,
+                        spatial_type, indicator)
+    )
+
+def warm_map_cache(n_years=MAP_CACHE_WARM_YEARS):
+    """
+    Pre-renders every sex and spatial type for the n most recent years.
+
+    Args:
+        n_years (int): Number of most recent years to render (0 disables).
+    """
+    if n_years <= 0:
+        return
+    for year in reversed(get_data_store().years[-n_years:]):
+        for sex in sex_codes_avail_raw:
+            for spatial_type in spatial_types:
+                render_map(year, sex, spatial_type)
@@ -0,0 +1,152 @@
+"""
+Custom Folium layers for the choropleth map.
+
+The boundaries are fetched by the browser from static geometry assets, at
+the simplification level matching the zoom; the rendered map only embeds
+the values and colours of the selection. During year playback the page
+posts value frames to the map, which restyles the shapes in place.
+"""
+
+from branca.element import MacroElement
+from jinja2 import Template
+
+
+class RemoteValueLayer(MacroElement):
+    """
+    Choropleth layer drawing remote GeoJSON with inline per-feature values.
+
+    Args:
+        levels (list): [max_zoom, url] pairs of the geometry assets, coarsest
+            first; a max_zoom of None means no upper zoom limit.
+        values (dict): Mapping of feature id to [value, fill colour].
+        nan_fill_color (str): Fill colour for features without a value.
+        fill_opacity (float): Fill opacity of features with a value.
+        line_opacity (float): Opacity of the boundary lines.
+        value_label (str): Tooltip label of the value.
+
+    The layer also accepts {type: "map-frame", frame} messages from the
+    parent page (see create_frame in src/components/map.py): the values
+    are replaced, the shapes restyled and the legend replaced by the
+    frame's scale.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var values = {{ this.values|tojson }};
+            var levels = {{ this.levels|tojson }};
+            var map = {{ this._parent.get_name() }};
+            var layer = null;
+            var currentUrl = null;
+            var legend = null;
+
+            function featureStyle(feature) {
+                var entry = values[feature.id];
+                return {
+                    color: "black",
+                    weight: 1,
+                    opacity: {{ this.line_opacity }},
+                    fillColor: entry ? entry[1] : {{ this.nan_fill_color|tojson }},
+                    fillOpacity: entry ? {{ this.fill_opacity }} : 0.4
+                };
+            }
+
+            function tooltip(feature) {
+                var entry = values[feature.id];
+                return "<b>Name:</b> " + feature.properties.name +
+                    "<br><b>" + {{ this.value_label|tojson }} + "</b> " +
+                    (entry ? entry[0].toLocaleString() : "n/a");
+            }
+
+            function showFrame(frame) {
+                var next = {};
+                Object.keys(frame.values).forEach(function(id) {
+                    var entry = frame.values[id];
+                    next[id] = [entry[0], frame.colors[entry[1]]];
+                });
+                values = next;
+                if (layer) {
+                    layer.setStyle(featureStyle);
+                }
+
+                // Replace the rendered legend with the frame's scale
+                document.querySelectorAll(".legend").forEach(function(element) {
+                    element.style.display = "none";
+                });
+                if (!legend) {
+                    legend = L.control({position: "topright"});
+                    legend.onAdd = function() {
+                        return L.DomUtil.create("div", "frame-legend");
+                    };
+                    legend.addTo(map);
+                }
+                var rows = frame.colors.map(function(color, i) {
+                    return '<div><span style="display:inline-block;width:14px;height:10px;' +
+                        'background:' + color + '"></span> ' +
+                        frame.index[i] + " – " + frame.index[i + 1] + "</div>";
+                });
+                var container = legend.getContainer();
+                container.style.cssText = "background:white;padding:6px 8px;font:12px sans-serif;";
+                container.innerHTML = "<b>" + frame.caption + "</b>" + rows.join("");
+            }
+
+            window.addEventListener("message", function(event) {
+                if (event.source === window.parent && event.data &&
+                        event.data.type === "map-frame") {
+                    showFrame(event.data.frame);
+                }
+            });
+
+            function urlForZoom(zoom) {
+                for (var i = 0; i < levels.length; i++) {
+                    if (levels[i][0] === null || zoom <= levels[i][0]) {
+                        return levels[i][1];
+                    }
+                }
+                return levels[levels.length - 1][1];
+            }
+
+            function draw() {
+                var url = urlForZoom(map.getZoom());
+                if (url === currentUrl) {
+                    return;
+                }
+                currentUrl = url;
+                fetch(url, {cache: "force-cache"})
+                    .then(function(response) { return response.json(); })
+                    .then(function(data) {
+                        if (url !== currentUrl) {
+                            return;
+                        }
+                        var next = L.geoJson(data, {
+                            style: featureStyle,
+                            onEachFeature: function(feature, featureLayer) {
+                                featureLayer.bindTooltip(function() {
+                                    return tooltip(feature);
+                                }, {sticky: true});
+                            }
+                        });
+                        if (layer) {
+                            map.removeLayer(layer);
+                        }
+                        layer = next.addTo(map);
+                    });
+            }
+
+            map.on("zoomend", draw);
+            draw();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, levels, values, nan_fill_color="lightgray",
+                 fill_opacity=0.7, line_opacity=0.3,
+                 value_label="Life Expectancy:"):
+        super().__init__()
+        self._name = "RemoteValueLayer"
+        self.levels = levels
+        self.values = values
+        self.nan_fill_color = nan_fill_color
+        self.fill_opacity = fill_opacity
+        self.line_opacity = line_opacity
+        self.value_label = value_label
@@ -2,37 +2,13 @@
 About page — project overview, KPIs, resources, and credits.
 """
 
+from functools import lru_cache
+
 from dash import html
 import dash_bootstrap_components as dbc
 import pandas as pd
 
-from src.utils.get_data import load_clean_data
-
-# ---------- Load data & quick stats ----------
-_df = load_clean_data()
-
-# Years
-_years = _df["TimeDim"].dropna().astype(int)
-year_min = int(_years.min()) if not _years.empty else None
-year_max = int(_years.max()) if not _years.empty else None
-
-# Countries (only COUNTRY level)
-try:
-    n_countries = (
-        _df[_df["SpatialDimType"] == "COUNTRY"]["SpatialDim"].nunique()
-    )
-except KeyError:
-    n_countries = _df["SpatialDim"].nunique()
-
-# Sexes (as-is from the cleaned CSV)
-sexes = (
-    sorted(pd.Series(_df["Dim1"]).dropna().astype(str).unique().tolist())
-    if "Dim1" in _df.columns
-    else []
-)
-
-# Total rows
-n_rows = len(_df)
+from src.utils.data_store import get_data_store
 
 # ---------- Blocks ----------
 
@@ -51,45 +27,105 @@ problem = dbc.Alert(
 
 # KPIs
 kpi_card_style = {"border": "none", "boxShadow": "0 2px 8px rgba(0,0,0,.06)"}
-kpis = dbc.Row(
-    [
-        dbc.Col(
-            dbc.Card(
-                dbc.CardBody([html.H6("Countries"), html.H3(f"{n_countries}")]),
-                style=kpi_card_style,
+
+
+@lru_cache(maxsize=1)
+def _kpis(version):
+    """
+    Builds the KPI cards from the loaded data (once per data version, so
+    that they follow refreshes of the data).
+    """
+    del version
+    store = get_data_store()
+    df = store.df
+
+    # Years
+    years = df["TimeDim"].dropna().astype(int)
+    year_min = int(years.min()) if not years.empty else None
+    year_max = int(years.max()) if not years.empty else None
+
+    # Countries (only COUNTRY level)
+    try:
+        n_countries = (
+            df[df["SpatialDimType"] == "COUNTRY"]["SpatialDim"].nunique()
+        )
+    except KeyError:
+        n_countries = df["SpatialDim"].nunique()
+
+    # Sexes (as-is from the cleaned CSV)
+    sexes = (
+        sorted(pd.Series(df["Dim1"]).dropna().astype(str).unique().tolist())
+        if "Dim1" in df.columns
+        else []
+    )
+
+    # Inter-regional gap (first and last year) and female advantage, from the
+    # precomputed regional aggregates
+    cube = store.aggregates
+    first_gap = cube.regional_gap(year_min, "Both") if year_min else None
+    last_gap = cube.regional_gap(year_max, "Both") if year_max else None
+    advantage = cube.advantage(year_max) if year_max else float("nan")
+
+    return dbc.Row(
+        [
+            dbc.Col(
+                dbc.Card(
+                    dbc.CardBody([html.H6("Countries"), html.H3(f"{n_countries}")]),
+                    style=kpi_card_style,
+                ),
+                md=3,
+                xs=6,
             ),
-            md=3,
-            xs=6,
-        ),
-        dbc.Col(
-            dbc.Card(
-                dbc.CardBody(
-                    [
-                        html.H6("Years range"),
-                        html.H3(f"{year_min}–{year_max}" if year_min and year_max else "—"),
-                    ]
+            dbc.Col(
+                dbc.Card(
+                    dbc.CardBody(
+                        [
+                            html.H6("Years range"),
+                            html.H3(f"{year_min}–{year_max}" if year_min and year_max else "—"),
+                        ]
+                    ),
+                    style=kpi_card_style,
                 ),
-                style=kpi_card_style,
+                md=3,
+                xs=6,
             ),
-            md=3,
-            xs=6,
-        ),
-        dbc.Col(
-            dbc.Card(
-                dbc.CardBody(
-                    [
-                        html.H6("Sexes"),
-                        html.H3(" · ".join(sexes) if sexes else "—"),
-                    ]
+            dbc.Col(
+                dbc.Card(
+                    dbc.CardBody(
+                        [
+                            html.H6("Sexes"),
+                            html.H3(" · ".join(sexes) if sexes else "—"),
+                        ]
+                    ),
+                    style=kpi_card_style,
                 ),
-                style=kpi_card_style,
+                md=3,
+                xs=6,
             ),
-            md=3,
-            xs=6,
-        ),
-    ],
-    className="g-3 mb-4",
-)
+            dbc.Col(
+                dbc.Card(
+                    dbc.CardBody(
+                        [
+                            html.H6("Gap between regions"),
+                            html.H3(
+                                f"{first_gap['gap']:.1f} → {last_gap['gap']:.1f} yrs"
+                                if first_gap and last_gap else "—"
+                            ),
+                            html.Small(
+                                f"Female advantage in {year_max}: {advantage:+.1f} yrs"
+                                if pd.notna(advantage) else ""
+                            ),
+                        ]
+                    ),
+                    style=kpi_card_style,
+                ),
+                md=3,
+                xs=6,
+            ),
+        ],
+        className="g-3 mb-4",
+    )
+
 
 # Objectives
 objectives = dbc.Card(
@@ -224,29 +260,33 @@ credits_section = dbc.Card(
 )
 
 # ---------- Page layout ----------
-page_layout = dbc.Container(
-    [
-        html.H1("About this project", className="mt-4 mb-3"),
-        problem,
-        kpis,
-        dbc.Row(
-            [
-                dbc.Col(objectives, md=6),
-                dbc.Col(data, md=6),
-            ],
-            className="g-3",
-        ),
-        dbc.Row(
-            [
-                dbc.Col(tech_stack, md=6),
-                dbc.Col(how_to_run, md=6),
-            ],
-            className="g-3",
-        ),
-        links,
-        cta,
-        credits_section,
-    ],
-    fluid=True,
-    className="mb-5",
-)
+
+
+def page_layout():
+    """Returns the page layout, built on every visit."""
+    return dbc.Container(
+        [
+            html.H1("About this project", className="mt-4 mb-3"),
+            problem,
+            _kpis(get_data_store().version),
+            dbc.Row(
+                [
+                    dbc.Col(objectives, md=6),
+                    dbc.Col(data, md=6),
+                ],
+                className="g-3",
+            ),
+            dbc.Row(
+                [
+                    dbc.Col(tech_stack, md=6),
+                    dbc.Col(how_to_run, md=6),
+                ],
+                className="g-3",
+            ),
+            links,
+            cta,
+            credits_section,
+        ],
+        fluid=True,
+        className="mb-5",
+    )
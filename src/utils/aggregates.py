@@ -0,0 +1,233 @@
+"""
+Regional aggregates module.
+
+Summarises the country rows of an indicator in a dense year x sex x WHO
+region cube (count, mean, min, max and spread of the values), with an
+extra slot aggregating every region. Two measures are derived from it:
+the inter-regional gap (highest minus lowest regional mean) and the
+female advantage (female minus male mean).
+
+The cube is built in one vectorized pass over the table; every query is
+answered by array indexing, and new or changed rows only recompute the
+(year, sex) cells they fall in.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.utils.regions import REGION_CODES
+
+SEXES = ("Both", "Female", "Male")
+
+# Pseudo-region aggregating every country of a WHO region
+ALL_REGIONS = "ALL"
+CUBE_REGIONS = REGION_CODES + (ALL_REGIONS,)
+
+_N_REGIONS = len(REGION_CODES)
+_FEMALE, _MALE = SEXES.index("Female"), SEXES.index("Male")
+
+
+def _codes(series: pd.Series, categories) -> np.ndarray:
+    """Returns the positions of a column's values in categories (-1 if absent)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.set_categories(categories).cat.codes.to_numpy()
+    return pd.Categorical(series, categories=categories).codes
+
+
+def _cell_positions(df: pd.DataFrame, years):
+    """
+    Returns the (year, sex, region) positions and values of the country rows
+    of df that belong to a cell (known year and sex, WHO region, a value).
+
+    Args:
+        df (pd.DataFrame): Cleaned rows.
+        years (list): Sorted years of the cube.
+    """
+    years = np.asarray(years if len(years) else [-1])
+    time_dim = df["TimeDim"].to_numpy()
+    year_pos = np.minimum(np.searchsorted(years, time_dim), len(years) - 1)
+    sexes = _codes(df["Dim1"], SEXES)
+    regions = _codes(df["RegionCode"], REGION_CODES)
+    values = df["NumericValue"].to_numpy(dtype="float64", na_value=np.nan)
+    keep = (
+        (df["SpatialDimType"] == "COUNTRY").to_numpy()
+        & (years[year_pos] == time_dim)
+        & (sexes >= 0) & (regions >= 0) & ~np.isnan(values)
+    )
+    return year_pos[keep], sexes[keep], regions[keep], values[keep]
+
+
+def _aggregate(years, sexes, regions, values, n_years: int):
+    """
+    Returns count, sum, min and max arrays of shape
+    (n_years, len(SEXES), len(CUBE_REGIONS)), the last region being
+    ALL_REGIONS. Empty cells hold 0 (count, sum) or NaN (min, max).
+    """
+    size = n_years * len(SEXES) * _N_REGIONS
+    flat = (years * len(SEXES) + sexes) * _N_REGIONS + regions
+    count = np.bincount(flat, minlength=size)
+    total = np.bincount(flat, weights=values, minlength=size)
+    minimum = np.full(size, np.inf)
+    maximum = np.full(size, -np.inf)
+    np.minimum.at(minimum, flat, values)
+    np.maximum.at(maximum, flat, values)
+
+    shape = (n_years, len(SEXES), _N_REGIONS)
+    arrays = []
+    for array, reduce in ((count, np.sum), (total, np.sum),
+                          (minimum, np.min), (maximum, np.max)):
+        array = array.reshape(shape)
+        arrays.append(np.concatenate([array, reduce(array, axis=2, keepdims=True)], axis=2))
+    count, total, minimum, maximum = arrays
+    empty = count == 0
+    minimum[empty] = np.nan
+    maximum[empty] = np.nan
+    return count, total, minimum, maximum
+
+
+class AggregateCube:
+    """
+    Year x sex x region aggregates of the country rows of a table.
+
+    Arrays are indexed by [year position, SEXES position, CUBE_REGIONS
+    position]; gap and gap_high/gap_low by [year, sex]; female_advantage
+    by [year, region].
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        countries = df["SpatialDimType"] == "COUNTRY"
+        self.years = sorted(int(year) for year in df.loc[countries, "TimeDim"].unique())
+        self._year_pos = {year: i for i, year in enumerate(self.years)}
+        self._sex_pos = {sex: i for i, sex in enumerate(SEXES)}
+        self._region_pos = {region: i for i, region in enumerate(CUBE_REGIONS)}
+        (self.count, self.total,
+         self.minimum, self.maximum) = _aggregate(*_cell_positions(df, self.years),
+                                                  len(self.years))
+        self._derive(np.arange(len(self.years)))
+
+    def _derive(self, year_positions) -> None:
+        """Recomputes the derived measures of some years."""
+        if not hasattr(self, "mean"):
+            shape = self.count.shape
+            self.mean = np.full(shape, np.nan)
+            self.spread = np.full(shape, np.nan)
+            self.gap = np.full(shape[:2], np.nan)
+            self.gap_high = np.full(shape[:2], -1)
+            self.gap_low = np.full(shape[:2], -1)
+            self.female_advantage = np.full((shape[0], shape[2]), np.nan)
+        rows = year_positions
+        count = self.count[rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, self.total[rows] / count, np.nan)
+        self.mean[rows] = mean
+        self.spread[rows] = self.maximum[rows] - self.minimum[rows]
+
+        regional = mean[:, :, :_N_REGIONS]
+        present = ~np.isnan(regional)
+        high = np.where(present, regional, -np.inf).argmax(axis=2)
+        low = np.where(present, regional, np.inf).argmin(axis=2)
+        has_regions = present.any(axis=2)
+        self.gap_high[rows] = np.where(has_regions, high, -1)
+        self.gap_low[rows] = np.where(has_regions, low, -1)
+        self.gap[rows] = np.where(
+            has_regions,
+            np.take_along_axis(regional, high[..., None], axis=2)[..., 0]
+            - np.take_along_axis(regional, low[..., None], axis=2)[..., 0],
+            np.nan,
+        )
+        self.female_advantage[rows] = mean[:, _FEMALE] - mean[:, _MALE]
+
+    def _add_years(self, years) -> None:
+        """Extends the year axis with new (empty) years."""
+        self.years = sorted(set(self.years) | set(years))
+        old = [self._year_pos[year] for year in self.years if year in self._year_pos]
+        new = [i for i, year in enumerate(self.years) if year in self._year_pos]
+        self._year_pos = {year: i for i, year in enumerate(self.years)}
+        for name, fill in (("count", 0), ("total", 0), ("minimum", np.nan),
+                           ("maximum", np.nan), ("mean", np.nan), ("spread", np.nan),
+                           ("gap", np.nan), ("gap_high", -1), ("gap_low", -1),
+                           ("female_advantage", np.nan)):
+            array = getattr(self, name)
+            grown = np.full((len(self.years),) + array.shape[1:], fill, dtype=array.dtype)
+            grown[new] = array[old]
+            setattr(self, name, grown)
+
+    def update(self, rows: pd.DataFrame, source) -> None:
+        """
+        Updates the cells touched by new or changed rows.
+
+        Only the (year, sex) blocks of the changed rows are re-aggregated,
+        from the country rows of source, and only their years get new
+        derived measures.
+
+        Args:
+            rows (pd.DataFrame): New or changed cleaned rows.
+            source (DataStore): Store holding the data after the change.
+        """
+        rows = rows.loc[rows["SpatialDimType"] == "COUNTRY", ["TimeDim", "Dim1"]]
+        keys = {(int(year), str(sex))
+                for year, sex in rows.drop_duplicates().itertuples(index=False)
+                if str(sex) in SEXES}
+        if not keys:
+            return
+        new_years = {year for year, _ in keys if year not in self._year_pos}
+        if new_years:
+            self._add_years(new_years)
+
+        blocks = pd.concat([source.select(year, sex, "COUNTRY") for year, sex in keys])
+        partial = _aggregate(*_cell_positions(blocks, self.years), len(self.years))
+        cells = (np.array([self._year_pos[year] for year, _ in keys]),
+                 np.array([self._sex_pos[sex] for _, sex in keys]))
+        for array, values in zip((self.count, self.total, self.minimum, self.maximum),
+                                 partial):
+            array[cells] = values[cells]
+        self._derive(np.unique(cells[0]))
+
+    def cell(self, year, sex, region=ALL_REGIONS):
+        """
+        Returns the aggregates of one cell.
+
+        Args:
+            year (int): Year.
+            sex (str): 'Both', 'Female' or 'Male'.
+            region (str): WHO region code, or ALL_REGIONS.
+
+        Returns:
+            dict: count, mean, min, max and spread (None if the cell is unknown).
+        """
+        y, s = self._year_pos.get(year), self._sex_pos.get(sex)
+        r = self._region_pos.get(region)
+        if y is None or s is None or r is None:
+            return None
+        return {
+            "count": int(self.count[y, s, r]),
+            "mean": float(self.mean[y, s, r]),
+            "min": float(self.minimum[y, s, r]),
+            "max": float(self.maximum[y, s, r]),
+            "spread": float(self.spread[y, s, r]),
+        }
+
+    def regional_gap(self, year, sex):
+        """
+        Returns the inter-regional gap of a selection.
+
+        Returns:
+            dict: gap (highest minus lowest regional mean) and the 'highest'
+            and 'lowest' region codes (None if the selection is unknown or
+            has no regional data).
+        """
+        y, s = self._year_pos.get(year), self._sex_pos.get(sex)
+        if y is None or s is None or self.gap_high[y, s] < 0:
+            return None
+        return {
+            "gap": float(self.gap[y, s]),
+            "highest": REGION_CODES[self.gap_high[y, s]],
+            "lowest": REGION_CODES[self.gap_low[y, s]],
+        }
+
+    def advantage(self, year, region=ALL_REGIONS) -> float:
+        """Returns the female minus male mean of a year and region (NaN if unknown)."""
+        y, r = self._year_pos.get(year), self._region_pos.get(region)
+        if y is None or r is None:
+            return float("nan")
+        return float(self.female_advantage[y, r])
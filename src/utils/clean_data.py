@@ -1,13 +1,83 @@
 """
 Data cleaning and preparation module.
 
-This script loads the raw data, performs cleaning
+This script streams the raw data in chunks, performs cleaning
 on columns and rows, removes empty columns,
-and exports the cleaned data as well as statistics.
+and exports the cleaned data as CSV plus a typed,
+memory-mappable Feather copy.
+
+Memory use is bounded by the chunk size: a first pass detects the
+empty columns, a second pass cleans each chunk, appends it to the CSV
+output and spills it by year for the Feather copy, which is then written
+one year at a time (see FeatherSpill).
 """
 
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+from config import CLEANED_FEATHER, DEFAULT_CSV, RAW_DATA_CSV
+from src.utils.data_store import DTYPES, to_store_layout
+from src.utils.get_data import feather
+from src.utils.regions import region_codes_for
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: no Feather copy is written without it
+    pa = None
+
+# Rows processed per chunk
+CHUNK_SIZE = 100_000
+
+# Raw sex codes and their cleaned labels
+SEX_LABELS = {
+    "SEX_BTSX": "Both",
+    "SEX_MLE": "Male",
+    "SEX_FMLE": "Female"
+}
+
+# Declared dtypes of the raw WHO columns (others are inferred)
+RAW_DTYPES = {
+    'Id': 'int64',
+    'IndicatorCode': 'string',
+    'SpatialDimType': 'string',
+    'SpatialDim': 'string',
+    'TimeDimType': 'string',
+    'ParentLocationCode': 'string',
+    'ParentLocation': 'string',
+    'Dim1Type': 'string',
+    'Dim1': pd.CategoricalDtype(list(SEX_LABELS)),
+    'TimeDim': 'Int16',
+    'Dim2Type': 'string',
+    'Dim2': 'string',
+    'Dim3Type': 'string',
+    'Dim3': 'string',
+    'DataSourceDimType': 'string',
+    'DataSourceDim': 'string',
+    'Value': 'string',
+    'NumericValue': 'float64',
+    'Low': 'float64',
+    'High': 'float64',
+    'Comments': 'string',
+    'Date': 'string',
+    'TimeDimensionValue': 'string',
+    'TimeDimensionBegin': 'string',
+    'TimeDimensionEnd': 'string',
+}
+
+# Columns not used by the dashboard
+UNUSED_COLS = [
+    'TimeDimType', 'ParentLocationCode', 'TimeDimensionValue',
+    'TimeDimensionBegin', 'TimeDimensionEnd', 'Date', 'Dim1Type',
+    'Id', 'IndicatorCode', 'Low', 'High', 'Value', 'ParentLocation'
+]
+
+# Columns of the cleaned schema, kept even when empty
+KEY_COLS = ['SpatialDimType', 'SpatialDim', 'Dim1', 'TimeDim', 'NumericValue']
+
 def is_column_empty(series: pd.Series) -> bool:
     """
     Checks if a column is completely empty (NaN or empty strings).
@@ -18,39 +88,194 @@ def is_column_empty(series: pd.Series) -> bool:
     Returns:
         bool: True if the column is empty, False otherwise.
     """
-    if series.dropna().empty:
+    values = series.dropna()
+    if values.empty:
         return True
-    if series.dtype == 'object':
-        non_empty = series.dropna().apply(lambda x: str(x).strip() != '')
-        return not non_empty.any()
+    if pd.api.types.is_string_dtype(values.dtype) or values.dtype == 'object':
+        return not values.astype('string').str.strip().ne('').any()
     return False
 
-def clean_data():
+def read_raw_chunks(path=RAW_DATA_CSV, chunksize: int = CHUNK_SIZE):
     """
-    Loads, cleans, and saves the DataFrame.
+    Iterates over the raw CSV in chunks with the declared dtypes.
+
+    Args:
+        path (Path): Raw CSV file.
+        chunksize (int): Rows per chunk.
+
+    Returns:
+        Iterator of pd.DataFrame chunks.
     """
-    # Load data
-    df = pd.read_csv('data/raw/rawdata.csv')
+    return pd.read_csv(path, dtype=RAW_DTYPES, chunksize=chunksize)
 
-    # Remove empty columns
-    empty_cols = [col for col in df.columns if is_column_empty(df[col])]
-    df = df.drop(columns=empty_cols)
+def find_empty_columns(path=RAW_DATA_CSV, chunksize: int = CHUNK_SIZE) -> list:
+    """
+    Returns the columns that are empty in every chunk of the raw CSV.
+    """
+    empty = None
+    for chunk in read_raw_chunks(path, chunksize):
+        if empty is None:
+            empty = list(chunk.columns)
+        empty = [col for col in empty if is_column_empty(chunk[col])]
+        if not empty:
+            break
+    return empty or []
 
-    # Remove unused columns
-    unused_cols = [
-        'TimeDimType', 'ParentLocationCode', 'TimeDimensionValue',
-        'TimeDimensionBegin', 'TimeDimensionEnd', 'Date', 'Dim1Type',
-        'Id', 'IndicatorCode', 'Low', 'High', 'Value', 'ParentLocation'
-    ]
-    df = df.drop(columns=unused_cols)
+def clean_chunk(df: pd.DataFrame, drop_cols) -> pd.DataFrame:
+    """
+    Cleans one chunk of raw data.
 
-    # Remap the 'Dim1' column
-    corresponding_dict = {
-        "SEX_BTSX": "Both",
-        "SEX_MLE": "Male",
-        "SEX_FMLE": "Female"
-    }
-    df['Dim1'] = df['Dim1'].map(corresponding_dict)
+    Args:
+        df (pd.DataFrame): Raw rows.
+        drop_cols (list): Columns to remove (empty and unused ones).
 
-    # Save the cleaned DataFrame
-    df.to_csv('data/cleaned/cleaneddata.csv', index=False)
+    Returns:
+        pd.DataFrame: The cleaned rows.
+    """
+    df = df.drop(columns=drop_cols, errors='ignore')
+
+    # Remap the 'Dim1' column (renaming categories, not every row)
+    df['Dim1'] = df['Dim1'].cat.rename_categories(SEX_LABELS)
+
+    # WHO region code of each country (empty for non-country rows)
+    df['RegionCode'] = region_codes_for(df['SpatialDim']).where(
+        df['SpatialDimType'] == 'COUNTRY'
+    )
+    return df
+
+def clean_data(raw_path=RAW_DATA_CSV, output_path=DEFAULT_CSV,
+               chunksize: int = CHUNK_SIZE, feather_path=CLEANED_FEATHER):
+    """
+    Loads, cleans, and saves the DataFrame, one chunk at a time.
+
+    Args:
+        raw_path (Path): Raw CSV file.
+        output_path (Path): Cleaned CSV file.
+        chunksize (int): Rows per chunk.
+        feather_path (Path): Feather copy of the cleaned data.
+    """
+    # Remove empty columns and unused columns
+    drop_cols = [col for col in find_empty_columns(raw_path, chunksize)
+                 if col not in KEY_COLS] + UNUSED_COLS
+
+    # Clean and append each chunk, then swap the files in atomically
+    tmp_path = f"{output_path}.tmp"
+    header = True
+    with tempfile.TemporaryDirectory(dir=Path(output_path).parent) as spill_dir:
+        spill = FeatherSpill(spill_dir, chunksize) if feather is not None else None
+        for chunk in read_raw_chunks(raw_path, chunksize):
+            chunk = clean_chunk(chunk, drop_cols)
+            chunk.to_csv(tmp_path, mode='w' if header else 'a', header=header, index=False)
+            header = False
+            if spill is not None:
+                spill.add(chunk)
+        if header:
+            # No rows: write the header of the cleaned schema
+            pd.DataFrame(columns=KEY_COLS + ['RegionCode']).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, output_path)
+
+        if spill is not None:
+            spill.write(feather_path)
+
+class FeatherSpill:
+    """
+    Builds the Feather copy of the cleaned data chunk by chunk.
+
+    The DataStore layout is sorted by year first (see SORT_COLUMNS in
+    src.utils.data_store), so chunks are spilled to one temporary Arrow
+    stream per year; write then reads the years back in order, a batch of
+    about batch_rows rows at a time, sorts every batch and appends it to the
+    file. Memory use is bounded by a chunk plus the rows of the largest
+    year. Category columns use the values collected while spilling, so every
+    batch shares their dictionaries.
+
+    Args:
+        spill_dir (Path): Directory of the temporary per-year streams.
+        batch_rows (int): Rows read back per written batch.
+    """
+
+    def __init__(self, spill_dir, batch_rows: int = CHUNK_SIZE):
+        self.spill_dir = Path(spill_dir)
+        self.batch_rows = batch_rows
+        self.schema = None
+        self.categories = {}
+        self._writers = {}
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """Spills one cleaned chunk to the streams of its years."""
+        if self.schema is None:
+            self.schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+        for col, dtype in DTYPES.items():
+            if isinstance(dtype, str) and dtype == 'category' and col in chunk.columns:
+                self.categories.setdefault(col, set()).update(chunk[col].dropna().unique())
+
+        # One conversion per chunk, then a zero-copy slice per year
+        chunk = chunk.sort_values('TimeDim', kind='stable')
+        table = pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+        years = chunk['TimeDim'].to_numpy(dtype='int64')
+        starts = np.flatnonzero(np.diff(years, prepend=years[:1] - 1))
+        for start, stop in zip(starts, np.append(starts[1:], len(years))):
+            year = int(years[start])
+            writer = self._writers.get(year)
+            if writer is None:
+                writer = self._writers[year] = pa.ipc.new_stream(
+                    str(self.spill_dir / f"{year}.arrows"), self.schema
+                )
+            writer.write_table(table.slice(start, stop - start))
+
+    def write(self, path=CLEANED_FEATHER) -> None:
+        """
+        Writes the spilled rows as an uncompressed Feather file in the
+        DataStore layout, swapped in atomically (see export_feather).
+        """
+        for writer in self._writers.values():
+            writer.close()
+        if not self._writers:
+            export_feather(pd.DataFrame(columns=KEY_COLS + ['RegionCode']), path)
+            return
+
+        tmp_path = f"{path}.tmp"
+        writer = None
+        try:
+            pending, size = [], 0
+            years = sorted(self._writers)
+            for i, year in enumerate(years):
+                with pa.OSFile(str(self.spill_dir / f"{year}.arrows")) as source:
+                    pending.append(pa.ipc.open_stream(source).read_all())
+                size += pending[-1].num_rows
+                if size < self.batch_rows and i < len(years) - 1:
+                    continue
+                rows = pa.concat_tables(pending).to_pandas()
+                pending, size = [], 0
+                for col, values in self.categories.items():
+                    rows[col] = pd.Categorical(rows[col], categories=sorted(values))
+                rows = to_store_layout(rows)
+                if writer is None:
+                    schema = pa.Schema.from_pandas(rows, preserve_index=False)
+                    writer = pa.ipc.new_file(tmp_path, schema)
+                writer.write_table(pa.Table.from_pandas(rows, schema=schema,
+                                                        preserve_index=False))
+        finally:
+            if writer is not None:
+                writer.close()
+        os.replace(tmp_path, path)
+
+def export_feather(df: pd.DataFrame, path=CLEANED_FEATHER) -> None:
+    """
+    Writes the cleaned data as an uncompressed Feather (Arrow IPC) file.
+
+    The file uses the DataStore dtypes and row order, so it can be
+    memory-mapped and used without re-sorting. It is swapped in atomically:
+    a store still mapping the previous file keeps reading it unchanged.
+    Nothing is written when pyarrow is not installed.
+
+    Args:
+        df (pd.DataFrame): The cleaned data.
+        path (Path): Output Feather file.
+    """
+    if feather is None:
+        return
+    tmp_path = f"{path}.tmp"
+    feather.write_feather(to_store_layout(df), tmp_path,
+                          compression='uncompressed')
+    os.replace(tmp_path, path)
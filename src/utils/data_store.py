@@ -0,0 +1,325 @@
+"""
+In-memory data store module.
+
+Loads the cleaned data of each indicator once per process with compact dtypes, sorted so that
+every (TimeDim, Dim1, SpatialDimType) selection is a contiguous block, and
+indexes those blocks for constant-time lookups by the pages. The regional
+aggregates (see src.utils.aggregates) are computed at the same time.
+
+When a partition is cleaned again (e.g. by src.utils.ingest), its store is
+swapped for a new one by refresh_data_store; the aggregates are then only
+recomputed for the cells whose rows changed. A serving process checks its
+loaded partitions on requests, at most every DATA_REFRESH_INTERVAL seconds,
+and refreshes the changed ones in a background thread (see
+register_data_refresh).
+"""
+
+import copy
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_REFRESH_INTERVAL, DEFAULT_INDICATOR
+from src.utils.aggregates import AggregateCube
+from src.utils.get_data import data_version, load_clean_data
+from src.utils.indicators import partition
+from src.utils.metrics import record_data_load
+from src.utils.regions import REGION_DTYPE
+
+# Lookup keys; every prefix of them is a contiguous block of rows
+KEY_COLUMNS = ["TimeDim", "Dim1", "SpatialDimType"]
+SORT_COLUMNS = KEY_COLUMNS + ["SpatialDim"]
+
+DTYPES = {
+    "SpatialDimType": "category",
+    "SpatialDim": "category",
+    "Dim1": "category",
+    "TimeDim": "int16",
+    "NumericValue": "float64",
+    "RegionCode": REGION_DTYPE,
+}
+
+# indicator code -> DataStore
+_STORES = {}
+_STORE_LOCK = threading.Lock()
+# Background refresh started by register_data_refresh
+_REFRESH = {"checked": 0.0, "thread": None}
+
+
+class DataStore:
+    """
+    Process-wide, read-only view of the cleaned data.
+
+    Rows are sorted by KEY_COLUMNS and a group index maps each
+    (year, sex) and (year, sex, spatial type) key to a row slice.
+    aggregates holds the year x sex x region cube of the country rows.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: str, aggregates=None):
+        df = _with_dtypes(df)
+        # Presorted input (e.g. the memory-mapped Feather file) is kept as is
+        order = np.lexsort([_sort_key(df[col]) for col in reversed(SORT_COLUMNS)])
+        if not np.array_equal(order, np.arange(len(df))):
+            df = df.take(order).reset_index(drop=True)
+        self.df = df
+        self.version = version
+        self.years = sorted(int(year) for year in self.df["TimeDim"].unique())
+        self.codes = self.df["SpatialDim"].to_numpy()
+        self.values = self.df["NumericValue"].to_numpy()
+        self._index = {}
+        for depth in (2, 3):
+            groups = self.df.groupby(KEY_COLUMNS[:depth], observed=True, sort=False)
+            for key, positions in groups.indices.items():
+                key = (int(key[0]),) + tuple(str(part) for part in key[1:])
+                self._index[key] = slice(int(positions[0]), int(positions[-1]) + 1)
+        # (year, sex, spatial type) blocks in row (hence year) order
+        self._blocks = sorted(
+            ((key, rows) for key, rows in self._index.items() if len(key) == 3),
+            key=lambda block: block[1].start,
+        )
+        self._block_years = np.array([key[0] for key, _ in self._blocks], dtype="int64")
+        self._spatial_codes = self.df["SpatialDim"].cat.codes.to_numpy()
+        self._region_codes = self.df["RegionCode"].cat.codes.to_numpy()
+        # A cube passed in (see refresh_data_store) is brought up to date by the caller
+        self.aggregates = AggregateCube(self.df) if aggregates is None else aggregates
+
+    def _slice(self, year, sex, spatial_type=None) -> slice:
+        """Returns the row slice of a selection (empty if unknown)."""
+        key = (year, sex) if spatial_type is None else (year, sex, spatial_type)
+        return self._index.get(key, slice(0, 0))
+
+    def select(self, year, sex, spatial_type=None) -> pd.DataFrame:
+        """
+        Returns the rows of a selection without scanning the table.
+
+        Args:
+            year (int): Year (TimeDim).
+            sex (str): Sex ('Male', 'Female', 'Both').
+            spatial_type (str, optional): 'COUNTRY', 'REGION', ...; all if None.
+
+        Returns:
+            pd.DataFrame: A read-only view of the matching rows.
+        """
+        return self.df.iloc[self._slice(year, sex, spatial_type)]
+
+    def value_map(self, year, sex, spatial_type) -> dict:
+        """Returns {SpatialDim: NumericValue} for a selection."""
+        rows = self._slice(year, sex, spatial_type)
+        return dict(zip(self.codes[rows].tolist(), self.values[rows].tolist()))
+
+    def value_array(self, year, sex, spatial_type=None) -> np.ndarray:
+        """Returns the NumericValue array of a selection (a view, not a copy)."""
+        return self.values[self._slice(year, sex, spatial_type)]
+
+    def iter_rows(self, year_from=None, year_to=None, sexes=None, spatial_types=None,
+                  countries=None, regions=None):
+        """
+        Yields the row positions of a range query, block by block, in table order.
+
+        Only the (year, sex, spatial type) blocks inside the query are
+        visited: the year range is found by binary search over the blocks,
+        countries by binary search inside each block (rows are sorted by
+        SpatialDim) and regions by a mask over the block rows only.
+
+        Args:
+            year_from (int, optional): First year (inclusive).
+            year_to (int, optional): Last year (inclusive).
+            sexes (iterable, optional): Sexes to keep (all if None).
+            spatial_types (iterable, optional): Spatial types to keep (all if None).
+            countries (iterable, optional): SpatialDim codes to keep (all if None).
+            regions (iterable, optional): WHO region codes to keep (all if None).
+
+        Yields:
+            slice or np.ndarray: Positions of the matching rows of one block.
+        """
+        first = 0 if year_from is None else np.searchsorted(self._block_years, year_from, "left")
+        last = (len(self._blocks) if year_to is None
+                else np.searchsorted(self._block_years, year_to, "right"))
+        sexes = None if sexes is None else set(sexes)
+        spatial_types = None if spatial_types is None else set(spatial_types)
+        if countries is not None:
+            wanted = self.df["SpatialDim"].cat.categories.get_indexer(list(countries))
+            countries = np.unique(wanted[wanted >= 0])
+        if regions is not None:
+            wanted = self.df["RegionCode"].cat.categories.get_indexer(list(regions))
+            regions = np.unique(wanted[wanted >= 0])
+
+        for (_, sex, spatial_type), rows in self._blocks[first:last]:
+            if ((sexes is not None and sex not in sexes)
+                    or (spatial_types is not None and spatial_type not in spatial_types)):
+                continue
+            if countries is None and regions is None:
+                yield rows
+                continue
+            positions = np.arange(rows.start, rows.stop)
+            if countries is not None:
+                codes = self._spatial_codes[rows]
+                starts = np.searchsorted(codes, countries, "left")
+                stops = np.searchsorted(codes, countries, "right")
+                positions = rows.start + np.concatenate(
+                    [np.arange(start, stop) for start, stop in zip(starts, stops)] or [[]]
+                ).astype(np.intp)
+            if regions is not None:
+                positions = positions[np.isin(self._region_codes[positions], regions)]
+            if len(positions):
+                yield positions
+
+
+def _with_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Casts the known columns to their compact DTYPES."""
+    return df.astype({col: dtype for col, dtype in DTYPES.items() if col in df.columns})
+
+
+def _sort_key(series: pd.Series) -> np.ndarray:
+    """Returns an array sorting like the column (category codes if categorical)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy()
+    return series.to_numpy()
+
+
+def to_store_layout(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the data with the DataStore dtypes and row order.
+
+    Args:
+        df (pd.DataFrame): Cleaned data.
+
+    Returns:
+        pd.DataFrame: Typed data sorted by SORT_COLUMNS.
+    """
+    return _with_dtypes(df).sort_values(SORT_COLUMNS, kind="stable", ignore_index=True)
+
+
+def get_data_store(indicator: str = DEFAULT_INDICATOR) -> DataStore:
+    """
+    Returns the process-wide DataStore of an indicator, loading its cleaned
+    data partition on first use.
+
+    Args:
+        indicator (str): GHO indicator code (see config.INDICATORS).
+    """
+    store = _STORES.get(indicator)
+    if store is None:
+        with _STORE_LOCK:
+            store = _STORES.get(indicator)
+            if store is None:
+                files = partition(indicator)
+                start = time.perf_counter()
+                df = load_clean_data(files.clean_csv, files.feather)
+                loaded = time.perf_counter()
+                store = _STORES[indicator] = DataStore(df, data_version(files.clean_csv))
+                suffix = "" if indicator == DEFAULT_INDICATOR else f":{indicator}"
+                record_data_load("load_clean_data" + suffix, loaded - start)
+                record_data_load("build_data_store" + suffix, time.perf_counter() - loaded)
+    return store
+
+
+def _changed_cells(previous: DataStore, store: DataStore) -> pd.DataFrame:
+    """
+    Returns the (TimeDim, Dim1, SpatialDimType) keys of the country blocks
+    whose codes or values differ between two stores (added and removed
+    blocks included).
+    """
+    keys = {key for key in previous._index.keys() | store._index.keys()
+            if len(key) == 3 and key[2] == "COUNTRY"}
+    changed = []
+    for key in keys:
+        before, after = previous._slice(*key), store._slice(*key)
+        if not (np.array_equal(previous.codes[before], store.codes[after])
+                and np.array_equal(previous.values[before], store.values[after],
+                                   equal_nan=True)):
+            changed.append(key)
+    return pd.DataFrame(changed, columns=KEY_COLUMNS)
+
+
+def refresh_data_store(indicator: str = DEFAULT_INDICATOR):
+    """
+    Reloads the DataStore of an indicator if its cleaned partition changed
+    since it was loaded.
+
+    The regional aggregates are not rebuilt: a copy of the previous cube is
+    updated with the (year, sex) cells whose country rows changed. Requests
+    already holding the previous store keep a consistent view of it. A store
+    that was never loaded is left to be loaded on first use.
+
+    Args:
+        indicator (str): GHO indicator code (see config.INDICATORS).
+
+    Returns:
+        DataStore: The current store, or None if it was never loaded.
+    """
+    with _STORE_LOCK:
+        previous = _STORES.get(indicator)
+        if previous is None:
+            return None
+        files = partition(indicator)
+        version = data_version(files.clean_csv)
+        if version == previous.version:
+            return previous
+        start = time.perf_counter()
+        aggregates = copy.deepcopy(previous.aggregates)
+        store = DataStore(load_clean_data(files.clean_csv, files.feather), version, aggregates)
+        aggregates.update(_changed_cells(previous, store), store)
+        _STORES[indicator] = store
+        suffix = "" if indicator == DEFAULT_INDICATOR else f":{indicator}"
+        record_data_load("refresh_data_store" + suffix, time.perf_counter() - start)
+    return store
+
+
+def changed_indicators() -> list:
+    """Returns the codes of the loaded stores whose cleaned partition changed."""
+    changed = []
+    for code, store in list(_STORES.items()):
+        try:
+            version = data_version(partition(code).clean_csv)
+        except OSError:
+            continue
+        if version != store.version:
+            changed.append(code)
+    return changed
+
+
+def refresh_changed_stores() -> list:
+    """
+    Refreshes every loaded store whose cleaned partition changed.
+
+    Returns:
+        list: Codes of the refreshed indicators.
+    """
+    changed = changed_indicators()
+    for code in changed:
+        refresh_data_store(code)
+    return changed
+
+
+def register_data_refresh(server, interval: float = DATA_REFRESH_INTERVAL) -> None:
+    """
+    Makes a Flask server pick up re-cleaned partitions without a restart.
+
+    On requests, at most every interval seconds, the loaded partitions are
+    checked (one stat per indicator); changed ones are refreshed in a
+    daemon thread while requests keep being served by the current stores.
+    Every worker process refreshes its own stores.
+
+    Args:
+        server (flask.Flask): The server behind the Dash app.
+        interval (float): Seconds between two checks (0 disables).
+    """
+    if not interval:
+        return
+
+    def check():
+        now = time.monotonic()
+        thread = _REFRESH["thread"]
+        if now - _REFRESH["checked"] < interval or (thread is not None and thread.is_alive()):
+            return
+        _REFRESH["checked"] = now
+        if changed_indicators():
+            thread = threading.Thread(target=refresh_changed_stores,
+                                      name="data-refresh", daemon=True)
+            _REFRESH["thread"] = thread
+            thread.start()
+
+    server.before_request(check)
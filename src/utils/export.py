@@ -0,0 +1,181 @@
+"""
+Data export module.
+
+Serves read-only range queries over the cleaned data of an indicator on
+the Flask server:
+
+    GET /api/data?indicator=WHOSIS_000001&country=FRA,DEU&region=EUR
+                 &year_from=2000&year_to=2020&sex=Female&spatial_type=COUNTRY
+                 &format=csv|jsonl|arrow
+
+Every filter is optional and list filters accept repeated or
+comma-separated values. Selections are resolved through the DataStore
+block index (DataStore.iter_rows), never by scanning the table, and the
+rows are streamed in chunks of EXPORT_CHUNK_ROWS by a generator, so memory
+use does not grow with the size of the answer. Arrow output (an Arrow IPC
+stream) requires pyarrow.
+"""
+
+import io
+
+import numpy as np
+from flask import Response, abort, request
+
+from config import DEFAULT_INDICATOR, EXPORT_CHUNK_ROWS, EXPORT_ROUTE
+from src.utils.aggregates import SEXES
+from src.utils.data_store import get_data_store
+from src.utils.indicators import available_indicators
+from src.utils.regions import REGION_CODES
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: only the Arrow format needs it
+    pa = None
+
+# format -> (mimetype, file extension)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+def _list_arg(name: str):
+    """Returns the values of a repeated or comma-separated argument (None if absent)."""
+    values = [value.strip() for arg in request.args.getlist(name)
+              for value in arg.split(",") if value.strip()]
+    return values or None
+
+
+def _year_arg(name: str):
+    value = request.args.get(name)
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        abort(400, description=f"'{name}' must be a year")
+
+
+def parse_query() -> dict:
+    """
+    Reads and validates the export query of the current request.
+
+    Returns:
+        dict: indicator, format and the DataStore.iter_rows filters.
+    """
+    indicator = request.args.get("indicator", DEFAULT_INDICATOR)
+    if indicator not in available_indicators():
+        abort(404, description=f"Unknown indicator '{indicator}'")
+    output = request.args.get("format", "csv")
+    if output not in FORMATS:
+        abort(400, description=f"'format' must be one of {', '.join(FORMATS)}")
+    if output == "arrow" and pa is None:
+        abort(400, description="The arrow format requires pyarrow")
+
+    sexes = _list_arg("sex")
+    if sexes and not set(sexes) <= set(SEXES):
+        abort(400, description=f"'sex' must be among {', '.join(SEXES)}")
+    regions = _list_arg("region")
+    if regions and not set(regions) <= set(REGION_CODES):
+        abort(400, description=f"'region' must be among {', '.join(REGION_CODES)}")
+
+    return {
+        "indicator": indicator,
+        "format": output,
+        "year_from": _year_arg("year_from"),
+        "year_to": _year_arg("year_to"),
+        "sexes": sexes,
+        "spatial_types": _list_arg("spatial_type"),
+        "countries": _list_arg("country"),
+        "regions": regions,
+    }
+
+
+def iter_chunks(store, chunk_rows: int = EXPORT_CHUNK_ROWS, **filters):
+    """
+    Yields the rows of a range query as DataFrames of about chunk_rows rows.
+
+    Args:
+        store (DataStore): Data of the indicator.
+        chunk_rows (int): Rows per chunk (blocks are never split).
+        **filters: DataStore.iter_rows filters.
+    """
+    pending, size = [], 0
+    for rows in store.iter_rows(**filters):
+        pending.append(rows)
+        size += rows.stop - rows.start if isinstance(rows, slice) else len(rows)
+        if size >= chunk_rows:
+            yield _take(store, pending)
+            pending, size = [], 0
+    if pending:
+        yield _take(store, pending)
+
+
+def _take(store, parts):
+    """Returns the rows of several slices / position arrays of a store."""
+    if len(parts) == 1 and isinstance(parts[0], slice):
+        return store.df.iloc[parts[0]]
+    return store.df.take(np.concatenate([
+        np.arange(part.start, part.stop) if isinstance(part, slice) else part
+        for part in parts
+    ]))
+
+
+def stream_csv(chunks, columns):
+    """Yields a CSV header, then every chunk as CSV."""
+    yield ",".join(columns) + "\n"
+    for chunk in chunks:
+        yield chunk.to_csv(header=False, index=False)
+
+
+def stream_jsonl(chunks):
+    """Yields every chunk as JSON Lines (one object per row)."""
+    for chunk in chunks:
+        yield chunk.to_json(orient="records", lines=True)
+
+
+def stream_arrow(chunks, schema):
+    """Yields an Arrow IPC stream, one record batch per chunk."""
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema,
+                                                          preserve_index=False))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+def export_data():
+    """Answers an export request with a streamed response."""
+    query = parse_query()
+    indicator, output = query.pop("indicator"), query.pop("format")
+    store = get_data_store(indicator)
+    chunks = iter_chunks(store, **query)
+
+    if output == "csv":
+        body = stream_csv(chunks, list(store.df.columns))
+    elif output == "jsonl":
+        body = stream_jsonl(chunks)
+    else:
+        body = stream_arrow(chunks, pa.Schema.from_pandas(store.df.iloc[:0],
+                                                          preserve_index=False))
+
+    mimetype, extension = FORMATS[output]
+    response = Response(body, mimetype=mimetype)
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename="{indicator}.{extension}"'
+    )
+    return response
+
+
+def register_export_routes(server) -> None:
+    """
+    Registers the data export route on the Flask server.
+
+    Args:
+        server (flask.Flask): The server behind the Dash app.
+    """
+    server.add_url_rule(EXPORT_ROUTE, "export_data", export_data)
@@ -0,0 +1,156 @@
+"""
+Geometry module.
+
+Holds country and region boundaries in an immutable structure loaded once
+per process, and publishes them as static, content-hashed GeoJSON assets.
+Maps reference those assets by URL and only carry their per-request values,
+so callbacks never mutate (nor re-send) shared geometry.
+"""
+
+import hashlib
+import json
+from typing import NamedTuple
+
+from flask import Response, abort, request
+
+# URL prefix under which geometry assets are served
+GEOMETRY_ROUTE = "/geometry"
+
+# Published assets, keyed by file name ('<name>.<hash>.geojson')
+_PUBLISHED = {}
+
+
+class GeometryFeature(NamedTuple):
+    """A single boundary: ISO-3 / region code, display name and geometry."""
+    id: str
+    name: str
+    geometry: dict
+
+
+class FrozenGeometry:
+    """
+    Read-only collection of boundary features.
+
+    The geometry dictionaries must be treated as immutable. The compact
+    serialized form and its content hash are computed once, on first use.
+    """
+
+    def __init__(self, features):
+        self._features = tuple(features)
+        self._ids = frozenset(feature.id for feature in self._features)
+        self._asset = None
+        self._content_hash = None
+
+    @classmethod
+    def from_geojson(cls, geojson: dict) -> "FrozenGeometry":
+        """
+        Builds a FrozenGeometry from a GeoJSON FeatureCollection.
+
+        Args:
+            geojson (dict): GeoJSON with an 'id' and a 'name' property per feature.
+
+        Returns:
+            FrozenGeometry: The frozen boundaries.
+        """
+        return cls(
+            GeometryFeature(
+                id=feature.get('id'),
+                name=feature.get('properties', {}).get('name'),
+                geometry=feature['geometry'],
+            )
+            for feature in geojson['features']
+        )
+
+    @property
+    def features(self) -> tuple:
+        """Returns the frozen features."""
+        return self._features
+
+    @property
+    def ids(self) -> frozenset:
+        """Returns the set of feature ids."""
+        return self._ids
+
+    @property
+    def asset(self) -> bytes:
+        """Returns the compact GeoJSON serialization of the boundaries."""
+        if self._asset is None:
+            geojson = {
+                'type': 'FeatureCollection',
+                'features': [
+                    {
+                        'type': 'Feature',
+                        'id': feature.id,
+                        'properties': {'name': feature.name},
+                        'geometry': feature.geometry,
+                    }
+                    for feature in self._features
+                ],
+            }
+            self._asset = json.dumps(geojson, separators=(',', ':')).encode('utf-8')
+        return self._asset
+
+    @property
+    def content_hash(self) -> str:
+        """Returns a short SHA-256 digest of the serialized boundaries."""
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha256(self.asset).hexdigest()[:16]
+        return self._content_hash
+
+
+def publish_geometry(name: str, geometry: FrozenGeometry) -> str:
+    """
+    Publishes boundaries as a static asset and returns its URL.
+
+    The URL embeds the content hash, so it can be cached forever by browsers.
+
+    Args:
+        name (str): Asset base name (e.g. 'countries').
+        geometry (FrozenGeometry): Boundaries to publish.
+
+    Returns:
+        str: Absolute path of the asset on the app server.
+    """
+    filename = f"{name}.{geometry.content_hash}.geojson"
+    _PUBLISHED[filename] = geometry
+    return f"{GEOMETRY_ROUTE}/{filename}"
+
+
+def published_geometry(url: str):
+    """Returns the FrozenGeometry published under a URL (None if unknown)."""
+    return _PUBLISHED.get(url.rsplit("/", 1)[-1])
+
+
+def publish_geometry_levels(name: str, levels) -> list:
+    """
+    Publishes every simplification level of a boundary set.
+
+    Args:
+        name (str): Asset base name (e.g. 'countries').
+        levels (list): (level, max_zoom, geojson) tuples, coarsest first.
+
+    Returns:
+        list: [max_zoom, url] pairs, coarsest first (max_zoom None = no limit).
+    """
+    return [
+        [max_zoom, publish_geometry(f"{name}-{level}", FrozenGeometry.from_geojson(geojson))]
+        for level, max_zoom, geojson in levels
+    ]
+
+
+def register_geometry_routes(server) -> None:
+    """
+    Registers the route serving published geometry on the Flask server.
+
+    Args:
+        server (flask.Flask): The server behind the Dash app.
+    """
+    @server.route(f"{GEOMETRY_ROUTE}/<filename>")
+    def serve_geometry(filename):
+        geometry = _PUBLISHED.get(filename)
+        if geometry is None:
+            abort(404)
+        response = Response(geometry.asset, mimetype="application/geo+json")
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        response.set_etag(geometry.content_hash)
+        return response.make_conditional(request)
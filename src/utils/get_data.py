@@ -8,13 +8,28 @@ and verifying availability of external resources.
 
 import json
 import sys
-import urllib.request
 from pathlib import Path
 
 import pandas as pd
 import requests
 
-from config import DEFAULT_CSV, WORLD_GEOJSON_URL, WHO_REGIONS_GEOJSON, URL
+try:
+    from pyarrow import feather
+except ImportError:  # optional: the CSV is used when pyarrow is missing
+    feather = None
+
+from config import (
+    CLEANED_FEATHER,
+    DEFAULT_CSV,
+    GEOMETRY_DIR,
+    GEOMETRY_LEVELS,
+    RAW_DATA_CSV,
+    WORLD_GEOJSON_URL,
+    WHO_REGIONS_GEOJSON,
+    URL,
+)
+from src.utils.ingest import ingest_raw_data
+from src.utils.resource_cache import get_resource, is_cached
 
 # Add project root to sys.path
 ROOT = Path(__file__).resolve().parents[2]
@@ -31,15 +46,25 @@ def check_url_availability(url: str, timeout: int = 10) -> bool:
 
 
 def check_all_resources_available() -> bool:
-    """Check availability of all important external URLs."""
-    urls = [WORLD_GEOJSON_URL, URL]
-    return all(check_url_availability(u) for u in urls)
+    """
+    Check that every external resource is available locally or remotely.
+
+    Resources already on disk (cached world GeoJSON, downloaded raw data)
+    need no network access; only missing ones are checked with a HEAD request.
+    """
+    local = {
+        WORLD_GEOJSON_URL: is_cached(WORLD_GEOJSON_URL),
+        URL: RAW_DATA_CSV.exists(),
+    }
+    return all(
+        available or check_url_availability(url)
+        for url, available in local.items()
+    )
 
 
 def load_world_geojson() -> dict:
-    """Load the world countries GeoJSON file."""
-    with urllib.request.urlopen(WORLD_GEOJSON_URL, timeout=15) as resp:
-        return json.load(resp)
+    """Load the world countries GeoJSON file (from the local cache when present)."""
+    return json.loads(get_resource(WORLD_GEOJSON_URL))
 
 
 def load_who_regions_geojson() -> dict:
@@ -48,27 +73,88 @@ def load_who_regions_geojson() -> dict:
         return json.load(file)
 
 
-def load_clean_data() -> pd.DataFrame:
+def load_geometry_levels(name: str) -> list:
+    """
+    Load the simplified geometry levels built for a boundary set.
+
+    Args:
+        name (str): Boundary set name ('countries' or 'regions').
+
+    Returns:
+        list: (level, max_zoom, geojson) tuples from coarsest to finest,
+        or an empty list if the levels have not been built.
+    """
+    levels = []
+    for level, (_, _, max_zoom) in GEOMETRY_LEVELS.items():
+        path = GEOMETRY_DIR / f"{name}.{level}.geojson"
+        if not path.exists():
+            return []
+        with open(path, "r", encoding="utf-8") as file:
+            levels.append((level, max_zoom, json.load(file)))
+    return levels
+
+
+def load_clean_data(csv_path: Path = DEFAULT_CSV,
+                    feather_path: Path = CLEANED_FEATHER) -> pd.DataFrame:
+    """
+    Load cleaned data, preferring the memory-mapped columnar artifact.
+
+    The Feather file is used when pyarrow is installed and the file is at
+    least as recent as the CSV; otherwise the CSV is parsed.
+    """
+    if has_clean_feather(csv_path, feather_path):
+        return load_clean_feather(feather_path)
+    return load_clean_csv(csv_path)
+
+
+def has_clean_feather(csv_path: Path = DEFAULT_CSV,
+                      feather_path: Path = CLEANED_FEATHER) -> bool:
+    """Check whether an up-to-date, readable Feather artifact exists."""
+    csv_path, feather_path = Path(csv_path), Path(feather_path)
+    return (
+        feather is not None
+        and feather_path.exists()
+        and (not csv_path.exists()
+             or feather_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns)
+    )
+
+
+def load_clean_csv(path: Path = DEFAULT_CSV) -> pd.DataFrame:
     """Load cleaned data from CSV file."""
-    return pd.read_csv(DEFAULT_CSV)
+    return pd.read_csv(path)
+
+
+def load_clean_feather(path: Path = CLEANED_FEATHER) -> pd.DataFrame:
+    """
+    Load cleaned data from the Feather artifact through a memory map.
+
+    Numeric columns are converted without copying, so worker processes
+    reading the same file share its physical pages.
+    """
+    table = feather.read_table(path, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def data_version(path: Path = DEFAULT_CSV) -> str:
+    """
+    Return a short fingerprint of a data file, used to key derived caches.
+
+    The fingerprint changes whenever the file is rewritten (size or
+    modification time differ).
+    """
+    stat = Path(path).stat()
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
 
 
 def download_raw_data() -> None:
     """
     Download raw data from the WHO API and save it locally.
-    Checks URL availability before downloading.
+    Checks URL availability before downloading. Only rows newer than
+    the local raw data are fetched (see src.utils.ingest).
     """
     if not check_url_availability(URL):
         print(f"Error: API URL not reachable: {URL}")
         return
 
-    response = requests.get(URL, timeout=30)
-    response.raise_for_status()
-
-    data = response.json()
-    df = pd.DataFrame(data["value"])
-
-    csv_path = Path("data/raw/rawdata.csv")
-    csv_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(csv_path, index=False)
-    print(f"Data downloaded and saved in {csv_path}")
+    count = ingest_raw_data(URL, RAW_DATA_CSV)
+    print(f"{count} rows downloaded and saved in {RAW_DATA_CSV}")
@@ -0,0 +1,188 @@
+"""
+Histogram engine module.
+
+Computes the life expectancy histogram (countries per range, with a WHO
+region breakdown) from presorted NumPy arrays. Sorted values and aligned
+region codes are kept per (year, sex), so any bin width is served with
+np.searchsorted / np.bincount; the sorted arrays are memoized per
+(data version, year, sex). The memo holds copies of the values only, never
+the DataStore, so a store that was replaced (see
+src.utils.data_store.refresh_data_store) and its memory-mapped file are
+released.
+
+The functions are pure and do not depend on Dash. The dashboard ships the
+sorted vectors to the browser (see assets/histogram.js, which mirrors
+bin_values) so that changing the bin width needs no server round trip.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from src.utils.regions import REGION_CODES
+
+# Memoized value slices: (data version, year, sex) -> ValueSlice, least
+# recently used first
+SLICE_CACHE_SIZE = 256
+_SLICES = OrderedDict()
+_SLICES_LOCK = threading.Lock()
+_SLICE_STATS = {"hits": 0, "misses": 0}
+
+
+class ValueSlice(NamedTuple):
+    """
+    Values of one selection, sorted, with aligned region codes.
+
+    countries holds aligned integer country ids when a country has several
+    values (e.g. all years), so that it is counted once per bin; it is None
+    when every country appears once.
+    """
+    values: np.ndarray
+    regions: np.ndarray
+    countries: np.ndarray = None
+
+
+class HistogramResult(NamedTuple):
+    """
+    Histogram of one selection.
+
+    labels: range label of every bin; counts: countries per bin;
+    region_counts: countries per (bin, region index in REGION_CODES).
+    """
+    labels: tuple
+    counts: np.ndarray
+    region_counts: np.ndarray
+
+
+def build_value_slice(values, regions, codes=None) -> ValueSlice:
+    """
+    Sorts values and region codes together, dropping NaN values.
+
+    Args:
+        values (np.ndarray): Life expectancy values.
+        regions (np.ndarray): Region index of each value (-1 if none).
+        codes (np.ndarray, optional): Country code of each value, used to
+            count each country once per bin.
+
+    Returns:
+        ValueSlice: The sorted arrays.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~np.isnan(values)
+    values = values[keep]
+    regions = np.asarray(regions, dtype=np.int8)[keep]
+    order = np.argsort(values, kind="stable")
+
+    countries = None
+    if codes is not None:
+        _, countries = np.unique(np.asarray(codes)[keep], return_inverse=True)
+        if countries.max(initial=-1) + 1 == len(countries):
+            countries = None
+        else:
+            countries = countries[order]
+    return ValueSlice(values[order], regions[order], countries)
+
+
+def bin_edges(vmin: float, vmax: float, step: int) -> np.ndarray:
+    """
+    Returns integer bin edges of width step covering [vmin, vmax].
+    """
+    low = int(math.floor(vmin / step) * step)
+    high = int(math.ceil(vmax / step) * step)
+    if high <= low:
+        high = low + step
+    return np.arange(low, high + step, step)
+
+
+def bin_values(value_slice: ValueSlice, step: int) -> HistogramResult:
+    """
+    Bins sorted values into ranges of width step, left-closed.
+
+    Args:
+        value_slice (ValueSlice): Sorted values and aligned region codes.
+        step (int): Bin width in years.
+
+    Returns:
+        HistogramResult: Labels, counts and per-region counts of every bin.
+    """
+    values, regions, countries = value_slice
+    edges = bin_edges(values[0], values[-1], step)
+    n_bins = len(edges) - 1
+    labels = tuple(f"{edges[i]}–{edges[i + 1] - 1}" for i in range(n_bins))
+
+    # Bin boundaries in the sorted array: bin i holds values[bounds[i]:bounds[i + 1]]
+    bounds = np.searchsorted(values, edges, side="left")
+    counts = np.diff(bounds)
+
+    in_range = bounds[-1]
+    bin_index = np.repeat(np.arange(n_bins), counts)
+    regions = regions[:in_range]
+    if countries is not None:
+        # Count each country once per bin
+        pairs = bin_index * (int(countries.max()) + 1) + countries[:in_range]
+        _, first = np.unique(pairs, return_index=True)
+        bin_index, regions = bin_index[first], regions[first]
+        counts = np.bincount(bin_index, minlength=n_bins)
+
+    known = regions >= 0
+    n_regions = len(REGION_CODES)
+    region_counts = np.bincount(
+        bin_index[known] * n_regions + regions[known],
+        minlength=n_bins * n_regions,
+    ).reshape(n_bins, n_regions)
+    return HistogramResult(labels, counts, region_counts)
+
+
+def _value_slice(store, year, sex) -> ValueSlice:
+    """ValueSlice of a store selection."""
+    rows = store.select(year, sex)
+    return build_value_slice(
+        rows["NumericValue"].to_numpy(),
+        rows["RegionCode"].cat.codes.to_numpy(),
+        rows["SpatialDim"].to_numpy(),
+    )
+
+
+def selection_slice(store, year, sex) -> ValueSlice:
+    """
+    Returns the sorted values of a (year, sex) selection of a DataStore.
+
+    Args:
+        store (DataStore): Indexed data.
+        year (int): Year (TimeDim).
+        sex (str): Sex ('Male', 'Female', 'Both').
+
+    Returns:
+        ValueSlice: The memoized sorted arrays (keyed by store.version).
+    """
+    key = (store.version, year, sex)
+    with _SLICES_LOCK:
+        value_slice = _SLICES.get(key)
+        if value_slice is not None:
+            _SLICES.move_to_end(key)
+            _SLICE_STATS["hits"] += 1
+            return value_slice
+        _SLICE_STATS["misses"] += 1
+    value_slice = _value_slice(store, year, sex)
+    with _SLICES_LOCK:
+        _SLICES[key] = value_slice
+        _SLICES.move_to_end(key)
+        while len(_SLICES) > SLICE_CACHE_SIZE:
+            _SLICES.popitem(last=False)
+    return value_slice
+
+
+def cache_stats() -> dict:
+    """Returns the hit/miss counters of the memoized value slices."""
+    with _SLICES_LOCK:
+        return {**_SLICE_STATS, "entries": len(_SLICES)}
+
+
+def clear_cache() -> None:
+    """Drops the memoized value slices (e.g. to time cold selections)."""
+    with _SLICES_LOCK:
+        _SLICES.clear()
+
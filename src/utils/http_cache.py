@@ -0,0 +1,124 @@
+"""
+HTTP compression and validation module.
+
+Adds to every complete 200 response of the Flask server behind the app:
+
+- a strong ETag computed from the uncompressed content (unless the route
+  already set one), and a 304 answer when the request's If-None-Match
+  matches it, for GET and for Dash's POST callback requests alike;
+- transparent compression, brotli when the 'brotli' package is installed
+  and accepted by the client, gzip otherwise. Compressed bodies are kept
+  in a byte-bounded LRU keyed by ETag, so static bundles and repeated
+  callback outputs are compressed once.
+
+Streamed responses (generators) are left untouched.
+"""
+
+import gzip
+import hashlib
+
+from flask import request
+
+from config import (
+    BROTLI_QUALITY, COMPRESSION_CACHE_MAX_BYTES, COMPRESSION_MIN_BYTES, GZIP_LEVEL,
+)
+from src.utils.metrics import register_cache
+from src.utils.render_cache import ByteLRUCache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+# Content types worth compressing (prefixes)
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript",
+    "application/geo+json", "image/svg+xml",
+)
+
+_COMPRESSED = ByteLRUCache(COMPRESSION_CACHE_MAX_BYTES)
+register_cache("compressed_responses", _COMPRESSED.stats)
+
+
+def _accepted_encoding():
+    """Returns the best content encoding accepted by the client, or None."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compresses a body.
+
+    Args:
+        data (bytes): Uncompressed body.
+        encoding (str): 'br' or 'gzip'.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _is_compressible(response) -> bool:
+    mimetype = response.mimetype or ""
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def _not_modified(response, etag: str):
+    """Turns a response into an empty 304 keeping its validators."""
+    response.status_code = 304
+    response.set_data(b"")
+    response.headers.pop("Content-Type", None)
+    response.set_etag(etag)
+    return response
+
+
+def compress_and_validate(response):
+    """
+    after_request hook adding ETags, If-None-Match handling and compression.
+    """
+    if (response.status_code != 200
+            or "Content-Encoding" in response.headers
+            or (response.is_streamed and not response.direct_passthrough)):
+        return response
+
+    # Files sent by Flask/Dash are buffered so they can be compressed
+    response.direct_passthrough = False
+    data = response.get_data()
+
+    etag, weak = response.get_etag()
+    if etag is None or weak:
+        etag = hashlib.sha256(data).hexdigest()[:32]
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+
+    encoding = _accepted_encoding()
+    compressed = (
+        encoding is not None
+        and len(data) >= COMPRESSION_MIN_BYTES
+        and _is_compressible(response)
+    )
+    variant = f"{etag}-{encoding}" if compressed else etag
+
+    if request.if_none_match.contains(variant) or request.if_none_match.contains(etag):
+        return _not_modified(response, variant)
+
+    if compressed:
+        response.set_data(_COMPRESSED.get_or_compute(
+            (etag, encoding), lambda: compress(data, encoding)
+        ))
+        response.headers["Content-Encoding"] = encoding
+        response.set_etag(variant)
+    return response
+
+
+def register_http_caching(server) -> None:
+    """Installs compression and ETag validation on a Flask server."""
+    server.after_request(compress_and_validate)
@@ -0,0 +1,71 @@
+"""
+Indicator registry module.
+
+Maps every indicator of config.INDICATORS to its API endpoint and to its
+own data partition (raw CSV, cleaned CSV and Feather copy), so that adding
+or refreshing an indicator never reprocesses the others. The default
+indicator keeps the historical file names (rawdata.csv, cleaneddata.csv).
+"""
+
+from pathlib import Path
+from typing import NamedTuple
+
+from config import (
+    CLEANED_DATA_DIR, CLEANED_FEATHER, DEFAULT_CSV, DEFAULT_INDICATOR,
+    GHO_API_URL, INDICATORS, RAW_DATA_CSV, RAW_DATA_DIR,
+)
+
+
+class Partition(NamedTuple):
+    """Files holding the data of one indicator."""
+    raw_csv: Path
+    clean_csv: Path
+    feather: Path
+
+
+def indicator_url(code: str, base_url: str = GHO_API_URL) -> str:
+    """Returns the GHO OData endpoint of an indicator."""
+    return f"{base_url}/{code}"
+
+
+def indicator_name(code: str) -> str:
+    """Returns the display name of an indicator."""
+    return INDICATORS.get(code, {}).get("name", code)
+
+
+def indicator_unit(code: str) -> str:
+    """Returns the unit of an indicator's values."""
+    return INDICATORS.get(code, {}).get("unit", "")
+
+
+def partition(code: str) -> Partition:
+    """
+    Returns the data files of an indicator.
+
+    Args:
+        code (str): GHO indicator code.
+
+    Returns:
+        Partition: Raw CSV, cleaned CSV and Feather paths.
+    """
+    if code == DEFAULT_INDICATOR:
+        return Partition(RAW_DATA_CSV, DEFAULT_CSV, CLEANED_FEATHER)
+    return Partition(
+        RAW_DATA_DIR / f"{code}.csv",
+        CLEANED_DATA_DIR / f"{code}.csv",
+        CLEANED_DATA_DIR / f"{code}.feather",
+    )
+
+
+def available_indicators() -> list:
+    """
+    Returns the registered indicators whose cleaned data exists, in
+    registry order.
+    """
+    return [code for code in INDICATORS if partition(code).clean_csv.exists()]
+
+
+def indicator_options() -> list:
+    """Returns dropdown options ({label, value}) of the available indicators."""
+    return [{"label": indicator_name(code), "value": code}
+            for code in available_indicators()]
@@ -0,0 +1,283 @@
+"""
+Incremental WHO data ingestion module.
+
+Fetches the GHO OData endpoint page by page ($top/$skip), restricted with
+$filter to rows whose Date is newer than the newest row already stored,
+parses each page as a stream of rows and merges them into the raw CSV
+store by Id.
+
+Registered indicators are ingested concurrently into their own raw
+partitions, through one pooled session that retries failed requests with
+exponential backoff; only partitions that received rows are re-cleaned,
+and the data stores already loaded by the process are refreshed with them.
+A running dashboard picks the re-cleaned partitions up on its own (see
+src.utils.data_store.register_data_refresh).
+
+Usage: python -m src.utils.ingest [INDICATOR_CODE ...]
+"""
+
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    DOWNLOAD_BACKOFF, DOWNLOAD_RETRIES, DOWNLOAD_WORKERS, GHO_API_URL,
+    INDICATORS, RAW_DATA_CSV, URL,
+)
+from src.utils.indicators import indicator_url, partition
+
+# Rows requested per page
+PAGE_SIZE = 5000
+
+_VALUE_START = re.compile(r'"value"\s*:\s*\[')
+
+
+def iter_odata_values(chunks):
+    """
+    Incrementally parses the 'value' array of an OData JSON response.
+
+    Only the row being decoded is buffered, so a page never has to be
+    materialized as a whole.
+
+    Args:
+        chunks (iterable): Text chunks of the response body.
+
+    Yields:
+        dict: One row of the 'value' array at a time.
+
+    Raises:
+        ValueError: If the body ends inside the array.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buffer = ""
+
+    # Skip everything up to the opening bracket of "value"
+    while True:
+        match = _VALUE_START.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        buffer += chunk
+
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if buffer.startswith("]"):
+            return
+        try:
+            if not buffer:
+                raise ValueError("need more data")
+            row, end = decoder.raw_decode(buffer)
+        except ValueError:
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError("Truncated OData response") from None
+            buffer += chunk
+            continue
+        yield row
+        buffer = buffer[end:]
+
+
+def latest_date(raw_csv: Path = RAW_DATA_CSV):
+    """
+    Returns the newest 'Date' value of the raw store, or None if it is empty.
+    """
+    if not Path(raw_csv).exists():
+        return None
+    dates = pd.read_csv(raw_csv, usecols=["Date"])["Date"].dropna()
+    if dates.empty:
+        return None
+    return dates.loc[pd.to_datetime(dates, utc=True).idxmax()]
+
+
+def fetch_pages(url: str = URL, since=None, page_size: int = PAGE_SIZE,
+                session=None, timeout: int = 30):
+    """
+    Fetches rows page by page from a GHO OData endpoint.
+
+    Args:
+        url (str): Indicator endpoint (e.g. config.URL).
+        since (str, optional): Only fetch rows whose Date is after this value.
+        page_size (int): Rows per request ($top).
+        session (requests.Session, optional): Session used for the requests.
+        timeout (int): Request timeout in seconds.
+
+    Yields:
+        list: The rows of each page.
+    """
+    session = session or requests.Session()
+    skip = 0
+    while True:
+        params = {"$top": page_size, "$skip": skip, "$orderby": "Id"}
+        if since:
+            params["$filter"] = f"Date gt {since}"
+        with session.get(url, params=params, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            response.encoding = response.encoding or "utf-8"
+            rows = list(iter_odata_values(
+                response.iter_content(chunk_size=64 * 1024, decode_unicode=True)
+            ))
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        skip += page_size
+
+
+def merge_raw_rows(rows: pd.DataFrame, raw_csv: Path = RAW_DATA_CSV) -> None:
+    """
+    Merges rows into the raw CSV store, replacing existing rows with the same Id.
+
+    The store is rewritten through a temporary file and an atomic rename.
+    """
+    raw_csv = Path(raw_csv)
+    if raw_csv.exists():
+        existing = pd.read_csv(raw_csv)
+        rows = pd.concat([existing, rows], ignore_index=True)
+        rows = rows.drop_duplicates(subset="Id", keep="last")
+    raw_csv.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = raw_csv.with_suffix(".csv.tmp")
+    rows.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, raw_csv)
+
+
+def ingest_raw_data(url: str = URL, raw_csv: Path = RAW_DATA_CSV,
+                    page_size: int = PAGE_SIZE, session=None) -> int:
+    """
+    Fetches the rows newer than the raw store and merges them by Id.
+
+    An empty or missing store results in a full, paged download.
+
+    Args:
+        url (str): Indicator endpoint.
+        raw_csv (Path): Raw CSV store.
+        page_size (int): Rows per request.
+        session (requests.Session, optional): Session used for the requests.
+
+    Returns:
+        int: Number of new or changed rows.
+    """
+    since = latest_date(raw_csv)
+    pages = [
+        pd.DataFrame(rows)
+        for rows in fetch_pages(url, since=since, page_size=page_size, session=session)
+    ]
+    if not pages:
+        return 0
+    new_rows = pd.concat(pages, ignore_index=True)
+    merge_raw_rows(new_rows, raw_csv)
+    return len(new_rows)
+
+
+def make_session(pool_size: int = DOWNLOAD_WORKERS, retries: int = DOWNLOAD_RETRIES,
+                 backoff: float = DOWNLOAD_BACKOFF) -> requests.Session:
+    """
+    Returns a session with a connection pool and automatic retries.
+
+    Connection errors and 429/5xx responses are retried with exponential
+    backoff (backoff, 2 x backoff, ...), honouring Retry-After.
+
+    Args:
+        pool_size (int): Connections kept per host.
+        retries (int): Retries per request.
+        backoff (float): Base backoff delay in seconds.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def ingest_indicators(codes=None, max_workers: int = DOWNLOAD_WORKERS,
+                      base_url: str = GHO_API_URL, page_size: int = PAGE_SIZE,
+                      session=None) -> dict:
+    """
+    Ingests several indicators concurrently, each into its own raw partition.
+
+    At most max_workers indicators are downloaded at a time, sharing one
+    pooled session. A failed indicator does not stop the others.
+
+    Args:
+        codes (iterable, optional): Indicator codes (default: all registered).
+        max_workers (int): Concurrent downloads.
+        base_url (str): GHO OData API root.
+        page_size (int): Rows per request.
+        session (requests.Session, optional): Session (default: make_session()).
+
+    Returns:
+        dict: {code: number of new or changed rows, or None if it failed}.
+    """
+    codes = list(codes or INDICATORS)
+    session = session or make_session(max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            code: executor.submit(ingest_raw_data, indicator_url(code, base_url),
+                                  partition(code).raw_csv, page_size, session)
+            for code in codes
+        }
+
+    counts = {}
+    for code, future in futures.items():
+        try:
+            counts[code] = future.result()
+        except (requests.RequestException, ValueError) as exc:
+            print(f"Error: {code} could not be ingested: {exc}")
+            counts[code] = None
+    return counts
+
+
+def update_indicators(codes=None, max_workers: int = DOWNLOAD_WORKERS,
+                      session=None) -> dict:
+    """
+    Ingests indicators, re-cleans the partitions that received rows and
+    refreshes their data stores (see src.utils.data_store.refresh_data_store).
+
+    Args:
+        codes (iterable, optional): Indicator codes (default: all registered).
+        max_workers (int): Concurrent downloads.
+        session (requests.Session, optional): Session (default: make_session()).
+
+    Returns:
+        dict: {code: number of new or changed rows, or None if it failed}.
+    """
+    from src.utils.clean_data import clean_data
+    from src.utils.data_store import refresh_data_store
+
+    counts = ingest_indicators(codes, max_workers, session=session)
+    for code, count in counts.items():
+        files = partition(code)
+        if count is None:
+            continue
+        if count or (files.raw_csv.exists() and not files.clean_csv.exists()):
+            clean_data(files.raw_csv, files.clean_csv, feather_path=files.feather)
+            refresh_data_store(code)
+    return counts
+
+
+if __name__ == "__main__":
+    for code, count in update_indicators(sys.argv[1:] or None).items():
+        if count is not None:
+            print(f"{code}: {count} new or changed rows ingested into "
+                  f"{partition(code).raw_csv}")
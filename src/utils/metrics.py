@@ -0,0 +1,183 @@
+"""
+Metrics module.
+
+Records the latency and output payload size of every Dash callback, the
+hit/miss counters of the caches and the data-load timings, and exposes
+them in the Prometheus text format on a /metrics route of the Flask server.
+
+Callbacks are timed around Dash's '/_dash-update-component' endpoint, so
+every server-side callback (whether registered with app.callback or
+dash.callback) is covered without wrapping it. Only successful responses
+are recorded, and only outputs declared in the app's callback map are
+used as label values (others are counted as 'unknown'). Cache counters are read
+from their caches at scrape time. When METRICS_ENABLED is off, no hook or
+route is installed and the only cost left is recording data-load timings.
+
+Metrics are kept per process: with several workers, each scrape reports
+the worker that served it (see the 'pid' label).
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+from config import METRICS_ENABLED, METRICS_ROUTE
+
+# Histogram buckets (upper bounds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAYLOAD_BUCKETS = (1e3, 1e4, 3e4, 1e5, 3e5, 1e6, 3e6, 1e7)
+
+_DASH_UPDATE_PATH = "/_dash-update-component"
+_LOCK = threading.Lock()
+
+
+def _escape(value: str) -> str:
+    """Escapes a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Prometheus histogram with one series per label value."""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, label_value: str, value: float) -> None:
+        """Adds one observation to the series of label_value."""
+        with _LOCK:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, base_labels: str) -> list:
+        """Returns the exposition lines of every series."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with _LOCK:
+            series = {key: (list(b), s, c) for key, (b, s, c) in self._series.items()}
+        for label_value, (bucket_counts, total, count) in sorted(series.items()):
+            labels = f'{base_labels},{self.label}="{_escape(label_value)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.6g}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return lines
+
+
+CALLBACK_LATENCY = Histogram(
+    "dashboard_callback_duration_seconds",
+    "Server-side duration of Dash callback requests.",
+    "callback", LATENCY_BUCKETS,
+)
+CALLBACK_PAYLOAD = Histogram(
+    "dashboard_callback_payload_bytes",
+    "Uncompressed size of Dash callback responses.",
+    "callback", PAYLOAD_BUCKETS,
+)
+
+# name -> seconds of the last data load steps
+_DATA_LOADS = {}
+
+# name -> function returning a dict with 'hits' and 'misses' (and optionally
+# 'evictions', 'entries', 'bytes')
+_CACHES = {}
+
+
+def record_data_load(step: str, seconds: float) -> None:
+    """Records the duration of a data-load step (e.g. 'load_clean_data')."""
+    _DATA_LOADS[step] = seconds
+
+
+def register_cache(name: str, stats) -> None:
+    """
+    Exposes the counters of a cache.
+
+    Args:
+        name (str): Cache name (value of the 'cache' label).
+        stats (callable): Returns a dict with 'hits' and 'misses', and
+            optionally 'evictions', 'entries' and 'bytes'.
+    """
+    _CACHES[name] = stats
+
+
+def render_metrics() -> str:
+    """Returns every metric in the Prometheus text format."""
+    base = f'pid="{os.getpid()}"'
+    lines = CALLBACK_LATENCY.render(base) + CALLBACK_PAYLOAD.render(base)
+
+    cache_stats = {name: stats() for name, stats in sorted(_CACHES.items())}
+    for key, metric, kind, help_text in (
+        ("hits", "dashboard_cache_hits_total", "counter", "Cache hits."),
+        ("misses", "dashboard_cache_misses_total", "counter", "Cache misses."),
+        ("evictions", "dashboard_cache_evictions_total", "counter", "Cache evictions."),
+        ("entries", "dashboard_cache_entries", "gauge", "Entries held by the cache."),
+        ("bytes", "dashboard_cache_bytes", "gauge", "Bytes held by the cache."),
+    ):
+        samples = [(name, stats[key]) for name, stats in cache_stats.items() if key in stats]
+        if samples:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{{base},cache="{_escape(name)}"}} {value}'
+                      for name, value in samples]
+
+    if _DATA_LOADS:
+        metric = "dashboard_data_load_seconds"
+        lines += [f"# HELP {metric} Duration of the data-load steps of this process.",
+                  f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{{base},step="{_escape(step)}"}} {seconds:.6g}'
+                  for step, seconds in sorted(_DATA_LOADS.items())]
+    return "\n".join(lines) + "\n"
+
+
+def _start_timer():
+    if request.path.endswith(_DASH_UPDATE_PATH):
+        g.metrics_start = time.perf_counter()
+
+
+def _record_callback(callback_map, response):
+    start = g.pop("metrics_start", None)
+    if start is not None and 200 <= response.status_code < 300:
+        body = request.get_json(silent=True)
+        output = body.get("output") if isinstance(body, dict) else None
+        if not isinstance(output, str) or output not in callback_map:
+            output = "unknown"
+        CALLBACK_LATENCY.observe(output, time.perf_counter() - start)
+        CALLBACK_PAYLOAD.observe(output, response.calculate_content_length() or 0)
+    return response
+
+
+def register_metrics_routes(server, callback_map) -> None:
+    """
+    Installs the callback timing hooks and the /metrics route on a Flask
+    server (nothing is installed when METRICS_ENABLED is off).
+
+    Call it after register_http_caching: Flask runs after_request hooks in
+    reverse order, so the payload sizes are then recorded before compression.
+
+    Args:
+        server (flask.Flask): The server behind the Dash app.
+        callback_map (dict): The app's callback map (app.callback_map),
+            whose keys are the accepted 'callback' label values.
+    """
+    if not METRICS_ENABLED:
+        return
+    server.before_request(_start_timer)
+    server.after_request(functools.partial(_record_callback, callback_map))
+    server.add_url_rule(
+        METRICS_ROUTE, "metrics",
+        lambda: Response(render_metrics(), mimetype="text/plain; version=0.0.4"),
+    )
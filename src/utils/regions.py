@@ -0,0 +1,84 @@
+"""
+WHO regions module.
+
+Defines the WHO regions and their member countries, and derives a
+country -> region lookup from them. Region columns use REGION_DTYPE, a
+categorical whose integer codes are positions in REGION_CODES.
+"""
+
+import pandas as pd
+
+WHO_REGIONS = {
+    'AFR': {
+        'name': 'Africa',
+        'countries': ['DZA', 'AGO', 'BEN', 'BWA', 'BFA', 'BDI', 'CMR', 'CPV',
+                      'CAF', 'TCD', 'COM', 'COG', 'CIV', 'COD', 'GNQ', 'ERI',
+                      'ETH', 'GAB', 'GMB', 'GHA', 'GIN', 'GNB', 'KEN', 'LSO',
+                      'LBR', 'MDG', 'MWI', 'MLI', 'MRT', 'MUS', 'MOZ', 'NAM',
+                      'NER', 'NGA', 'RWA', 'STP', 'SEN', 'SYC', 'SLE', 'ZAF',
+                      'SSD', 'SWZ', 'TGO', 'UGA', 'TZA', 'ZMB', 'ZWE', 'MAR',
+                      'SOM', 'SDN','EGY','LBY', 'TUN', 'DJI']
+    },
+    'AMR': {
+        'name': 'Americas',
+        'countries': ['ATG', 'ARG', 'BHS', 'BRB', 'BLZ', 'BOL', 'BRA', 'CAN',
+                      'CHL', 'COL', 'CRI', 'CUB', 'DMA', 'DOM', 'ECU', 'SLV',
+                      'GRD', 'GTM', 'GUY', 'HTI', 'HND', 'JAM', 'MEX', 'NIC',
+                      'PAN', 'PRY', 'PER', 'KNA', 'LCA', 'VCT', 'SUR', 'TTO',
+                      'USA', 'URY', 'VEN','GUF']
+    },
+    'SEAR': {
+        'name': 'South-East Asia',
+        'countries': ['BGD', 'BTN', 'IND', 'IDN', 'MDV', 'MMR', 'NPL',
+                      'LKA', 'THA', 'TLS','MYS']
+    },
+    'EUR': {
+        'name': 'Europe',
+        'countries': ['ALB', 'AND', 'ARM', 'AUT', 'AZE', 'BLR', 'BEL', 'BIH',
+                      'BGR', 'HRV', 'CYP', 'CZE', 'DNK', 'EST', 'FIN', 'FRA',
+                      'GEO', 'DEU', 'GRC', 'HUN', 'ISL', 'IRL', 'ITA',
+                      'KAZ', 'KGZ', 'LVA', 'LTU', 'LUX', 'MLT', 'MCO', 'MNE',
+                      'NLD', 'MKD', 'NOR', 'POL', 'PRT', 'MDA', 'ROU', 'RUS',
+                      'SMR', 'SRB', 'SVK', 'SVN', 'ESP', 'SWE', 'CHE', 'TJK',
+                      'TUR', 'TKM', 'UKR', 'GBR', 'UZB','RS-KM']
+    },
+    'EMR': {
+        'name': 'Eastern Mediterranean',
+        'countries': ['AFG', 'BHR', 'IRN', 'IRQ', 'JOR', 'KWT',
+                      'LBN', 'OMN', 'PAK', 'PSE', 'QAT', 'SAU',
+                      'SYR', 'ARE', 'YEM','ISR']
+    },
+    'WPR': {
+        'name': 'Western Pacific',
+        'countries': ['AUS', 'BRN', 'KHM', 'CHN', 'COK', 'FJI', 'JPN', 'KIR',
+                      'LAO', 'MHL', 'FSM', 'MNG', 'NRU', 'NZL', 'NIU',
+                      'PLW', 'PNG', 'PHL', 'KOR','PRK','WSM', 'SGP', 'SLB', 'TON',
+                      'TUV', 'VUT', 'VNM']
+    }
+}
+
+# Region codes and names, in index order
+REGION_CODES = tuple(WHO_REGIONS)
+REGION_NAMES = tuple(info['name'] for info in WHO_REGIONS.values())
+REGION_DTYPE = pd.CategoricalDtype(REGION_CODES)
+
+# Country ISO-3 code -> region code
+COUNTRY_REGION = {
+    country: region_code
+    for region_code, info in WHO_REGIONS.items()
+    for country in info['countries']
+}
+
+
+def region_codes_for(countries) -> pd.Series:
+    """
+    Maps country ISO-3 codes to their WHO region code.
+
+    Args:
+        countries (array-like): Country codes.
+
+    Returns:
+        pd.Series: Region codes as REGION_DTYPE (NaN outside every WHO region).
+    """
+    return pd.Series(countries).map(COUNTRY_REGION).astype(REGION_DTYPE)
+
@@ -0,0 +1,109 @@
+"""
+Rendered output cache module.
+
+Provides a thread-safe LRU cache whose capacity is bounded by the total
+size in bytes of the stored values, used to keep rendered map HTML
+between callbacks.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def value_size(value) -> int:
+    """
+    Returns the size in bytes of a cached value.
+
+    Args:
+        value: The cached value (str, bytes or any object with a length).
+
+    Returns:
+        int: The number of bytes the value accounts for in the cache.
+    """
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(value)
+
+
+class ByteLRUCache:
+    """
+    Least-recently-used cache capped by the total byte size of its values.
+
+    Keeps hit, miss and eviction counters so that the capacity can be
+    sized from real traffic.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached value for key (or None) and records a hit/miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value) -> None:
+        """
+        Stores a value, evicting the least recently used entries as needed.
+
+        Values larger than the whole cache are not stored.
+        """
+        size = value_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: A hashable cache key.
+            compute (callable): Zero-argument function producing the value.
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drops every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Returns the cache counters and current occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,170 @@
+"""
+Remote resource cache module.
+
+Keeps a local, content-addressed copy of every remote resource used by the
+app (objects stored under their SHA-256 digest) together with the ETag and
+Last-Modified headers of the response. Reads are served from the cache
+without touching the network; revalidation uses conditional requests and
+can run in a background thread.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from config import RESOURCE_CACHE_DIR
+
+_INDEX_LOCK = threading.Lock()
+
+
+def _index_path(cache_dir: Path) -> Path:
+    return cache_dir / "index.json"
+
+
+def _object_path(cache_dir: Path, digest: str) -> Path:
+    return cache_dir / "objects" / digest
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Writes a file through a temporary file and an atomic rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+    with os.fdopen(fd, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+def _load_index(cache_dir: Path) -> dict:
+    try:
+        with open(_index_path(cache_dir), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def cache_entry(url: str, cache_dir: Path = RESOURCE_CACHE_DIR):
+    """
+    Returns the cache entry of a URL, or None if it is not cached.
+
+    The entry holds the object digest, ETag, Last-Modified and fetch time.
+    """
+    entry = _load_index(cache_dir).get(url)
+    if entry and _object_path(cache_dir, entry["sha256"]).exists():
+        return entry
+    return None
+
+
+def is_cached(url: str, cache_dir: Path = RESOURCE_CACHE_DIR) -> bool:
+    """Check whether a URL has a local copy."""
+    return cache_entry(url, cache_dir) is not None
+
+
+def fetch_resource(url: str, timeout: int = 15,
+                   cache_dir: Path = RESOURCE_CACHE_DIR) -> bytes:
+    """
+    Fetches a URL into the cache, revalidating any existing copy.
+
+    Sends If-None-Match / If-Modified-Since when the URL is cached; a
+    304 response keeps the local object.
+
+    Args:
+        url (str): Resource URL.
+        timeout (int): Request timeout in seconds.
+        cache_dir (Path): Cache directory.
+
+    Returns:
+        bytes: The current content of the resource.
+
+    Raises:
+        requests.RequestException: If the request fails.
+    """
+    entry = cache_entry(url, cache_dir)
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = requests.get(url, headers=headers, timeout=timeout)
+    if entry and response.status_code == 304:
+        content = _object_path(cache_dir, entry["sha256"]).read_bytes()
+    else:
+        response.raise_for_status()
+        content = response.content
+
+    digest = hashlib.sha256(content).hexdigest()
+    object_path = _object_path(cache_dir, digest)
+    if not object_path.exists():
+        _atomic_write(object_path, content)
+
+    with _INDEX_LOCK:
+        index = _load_index(cache_dir)
+        index[url] = {
+            "sha256": digest,
+            "etag": response.headers.get("ETag", entry and entry.get("etag")),
+            "last_modified": response.headers.get(
+                "Last-Modified", entry and entry.get("last_modified")
+            ),
+            "fetched_at": time.time(),
+        }
+        _atomic_write(_index_path(cache_dir),
+                      json.dumps(index, indent=2).encode("utf-8"))
+    return content
+
+
+def get_resource(url: str, timeout: int = 15,
+                 cache_dir: Path = RESOURCE_CACHE_DIR) -> bytes:
+    """
+    Returns a resource from the cache, downloading it only if absent.
+
+    Args:
+        url (str): Resource URL.
+        timeout (int): Request timeout in seconds (first download only).
+        cache_dir (Path): Cache directory.
+
+    Returns:
+        bytes: The resource content.
+    """
+    entry = cache_entry(url, cache_dir)
+    if entry:
+        return _object_path(cache_dir, entry["sha256"]).read_bytes()
+    return fetch_resource(url, timeout=timeout, cache_dir=cache_dir)
+
+
+def revalidate(urls, timeout: int = 15,
+               cache_dir: Path = RESOURCE_CACHE_DIR) -> None:
+    """
+    Revalidates cached resources with conditional requests.
+
+    Network errors are ignored: the cached copies stay in use.
+    """
+    for url in urls:
+        try:
+            fetch_resource(url, timeout=timeout, cache_dir=cache_dir)
+        except requests.RequestException:
+            pass
+
+
+def revalidate_in_background(urls, timeout: int = 15,
+                             cache_dir: Path = RESOURCE_CACHE_DIR) -> threading.Thread:
+    """
+    Starts revalidating resources in a daemon thread.
+
+    Updated content is used by the next process start.
+
+    Returns:
+        threading.Thread: The started thread.
+    """
+    thread = threading.Thread(
+        target=revalidate, args=(list(urls), timeout, cache_dir),
+        name="resource-revalidation", daemon=True,
+    )
+    thread.start()
+    return thread
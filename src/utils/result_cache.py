@@ -0,0 +1,218 @@
+"""
+Shared callback result cache module.
+
+Stores callback outputs in a local SQLite file so that every worker process
+on a node (and every restart) reuses a result computed once. Entries are
+keyed by callback id and inputs, tagged with the version of the data that
+produced them (e.g. the DataStore version of the selected indicator), expire
+after a TTL and are evicted least-recently-used when the file exceeds its
+size budget. An entry of another version is never served: it is replaced by
+the next result computed for the same inputs, or evicted.
+
+Hits are read-only: their access times are kept in memory and written in
+one batch at most every RESULT_CACHE_ACCESS_FLUSH seconds, or before the
+next store, so readers in different workers never wait on each other.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import (
+    RESULT_CACHE_ACCESS_FLUSH, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_PATH, RESULT_CACHE_TTL,
+)
+from src.utils.metrics import register_cache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+def make_key(callback_id: str, args) -> str:
+    """
+    Returns the cache key of a callback call.
+
+    Args:
+        callback_id (str): Callback identifier.
+        args (sequence): Callback input values (JSON-serializable).
+
+    Returns:
+        str: SHA-256 hex digest of the callback id and inputs.
+    """
+    payload = json.dumps([callback_id, list(args)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed result cache shared by all processes using the same file.
+
+    Values must be JSON-serializable. Database errors never propagate: the
+    cache then behaves as a miss and results are recomputed.
+    """
+
+    def __init__(self, path, max_bytes: int, ttl: float,
+                 access_flush: float = RESULT_CACHE_ACCESS_FLUSH):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.access_flush = access_flush
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        # key -> last access time of the hits not written yet
+        self._accessed = {}
+        self._accessed_lock = threading.Lock()
+        self._flushed = time.monotonic()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns a connection owned by the current process and thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str, version: str):
+        """Returns the cached value (or None) and records a hit/miss."""
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, created FROM results WHERE key = ? AND version = ?",
+                (key, version),
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            with self._accessed_lock:
+                self._accessed[key] = now
+            if time.monotonic() - self._flushed >= self.access_flush:
+                self._flush_accesses(conn)
+        except sqlite3.Error:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def _flush_accesses(self, conn) -> None:
+        """Writes the access times of the hits recorded since the last flush."""
+        with self._accessed_lock:
+            accessed, self._accessed = self._accessed, {}
+            self._flushed = time.monotonic()
+        if accessed:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("UPDATE results SET accessed = ? WHERE key = ?",
+                                 [(when, key) for key, when in accessed.items()])
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def put(self, key: str, version: str, value) -> None:
+        """Stores a value, then evicts expired and least recently used entries."""
+        data = json.dumps(value)
+        now = time.time()
+        try:
+            conn = self._connection()
+            self._flush_accesses(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (key, version, data, len(data), now, now),
+            )
+            self._evict(conn, now)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn, now: float) -> None:
+        """Removes expired entries and trims the cache to max_bytes."""
+        conn.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM results ORDER BY accessed").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+    def get_or_compute(self, callback_id: str, args, version: str, compute,
+                       current_version=None):
+        """
+        Returns the cached result of a call, computing and storing it on a miss.
+
+        Args:
+            callback_id (str): Callback identifier.
+            args (sequence): Callback input values.
+            version (str): Data version the result depends on.
+            compute (callable): Zero-argument function producing the result.
+            current_version (callable, optional): Returns the version after
+                the computation; the result is not stored if it differs
+                (the data changed meanwhile).
+        """
+        key = make_key(callback_id, args)
+        value = self.get(key, version)
+        if value is None:
+            value = compute()
+            if current_version is None or current_version() == version:
+                self.put(key, version, value)
+        return value
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters of the current process."""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+# Process-wide instance (None when disabled in config)
+RESULT_CACHE = (
+    ResultCache(str(RESULT_CACHE_PATH), RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL)
+    if RESULT_CACHE_PATH else None
+)
+if RESULT_CACHE is not None:
+    register_cache("shared_results", RESULT_CACHE.stats)
+
+
+def shared_result(callback_id: str, version_getter):
+    """
+    Decorates a Dash callback so that its results go through RESULT_CACHE.
+
+    Args:
+        callback_id (str): Callback identifier (part of the key).
+        version_getter (callable): Called with the callback arguments;
+            returns the version of the data the call is computed from (the
+            loaded DataStore, not the files on disk).
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(func):
+        if RESULT_CACHE is None:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            return RESULT_CACHE.get_or_compute(
+                callback_id, args, version_getter(*args), lambda: func(*args),
+                lambda: version_getter(*args),
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+"""
+Pre-rendered views module.
+
+Reads the manifest written by scripts/prerender_views.py: the pages look
+a view up by key before rendering it, and use its content-hashed file.
+
+Every view records the versions of the inputs it was built from (data of
+its indicator, published geometry of a map, source of its renderer); a
+view whose inputs changed since is ignored, and rendered live, until the
+next build. The manifest is re-read when its file changes, so a build is
+picked up without restarting the server.
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from config import ROOT, VIEWS_DIR, VIEWS_MANIFEST
+
+# Sources whose changes invalidate every view of a renderer
+RENDERER_SOURCES = {
+    "map": ["src/components/map.py", "src/components/map_layers.py"],
+    "histogram": ["src/components/histogram.py", "src/utils/histogram_engine.py"],
+}
+
+
+def view_key(kind: str, indicator: str, *params) -> str:
+    """
+    Returns the manifest key of a view.
+
+    Args:
+        kind (str): 'map' or 'histogram-values'.
+        indicator (str): GHO indicator code.
+        *params: Selection (e.g. year, sex and spatial type).
+
+    Returns:
+        str: e.g. 'map/WHOSIS_000001/2021/Female/COUNTRY'.
+    """
+    return "/".join(str(part) for part in (kind, indicator) + params)
+
+
+@lru_cache(maxsize=1)
+def _read_manifest(path, mtime_ns) -> dict:
+    """Parsed manifest (the modification time is part of the key)."""
+    del mtime_ns
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def load_manifest(path=VIEWS_MANIFEST) -> dict:
+    """
+    Returns the views manifest ({} if no build was made).
+
+    Returns:
+        dict: 'views' ({key: {'file', 'inputs', 'versions'}}), versions
+            being {input name: version} with names such as 'data:<code>',
+            'geometry:<spatial type>' or 'renderer:<renderer>'.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    return _read_manifest(str(path), mtime_ns)
+
+
+def prerendered_view(key: str, versions: dict, manifest=None):
+    """
+    Returns the content of a pre-rendered view, if it is up to date.
+
+    Args:
+        key (str): View key (see view_key).
+        versions (dict): Current version of every input of the view
+            (e.g. {'data:WHOSIS_000001': data version}).
+        manifest (dict, optional): Manifest (default: load_manifest()).
+
+    Returns:
+        str: The file content, or None if the view is missing or stale.
+    """
+    manifest = load_manifest() if manifest is None else manifest
+    entry = manifest.get("views", {}).get(key)
+    if entry is None:
+        return None
+    built = entry.get("versions", {})
+    if any(built.get(name) != version for name, version in versions.items()):
+        return None
+    try:
+        return (VIEWS_DIR / entry["file"]).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def geometry_version(levels) -> str:
+    """Returns the version of published geometry levels (their hashed URLs)."""
+    return " ".join(url for _, url in levels)
+
+
+@lru_cache(maxsize=None)
+def renderer_version(renderer: str) -> str:
+    """
+    Returns the version of a renderer (digest of its RENDERER_SOURCES),
+    computed once per process.
+    """
+    digest = hashlib.sha256()
+    for path in RENDERER_SOURCES[renderer]:
+        digest.update((ROOT / path).read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
@@ -0,0 +1,155 @@
+"""
+Tests of the incremental WHO ingestion (src.utils.ingest).
+
+A local HTTP server stands in for the GHO OData API: it serves recorded
+rows of WHOSIS_000001 (tests/data) with the $top/$skip paging, the
+$filter on Date and the $orderby on Id of the real endpoint.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+import requests
+
+from src.utils.ingest import ingest_raw_data, iter_odata_values
+
+DATA_DIR = Path(__file__).parent / "data"
+ENDPOINT = "/api/WHOSIS_000001"
+
+
+def _recorded(name: str) -> dict:
+    """Returns a recorded GHO response."""
+    with open(DATA_DIR / name, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class _GHOHandler(BaseHTTPRequestHandler):
+    """Answers OData queries over the rows of the server."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        url = urlsplit(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        self.server.queries.append(query)
+        if url.path != ENDPOINT:
+            self.send_error(404)
+            return
+
+        rows = sorted(self.server.rows.values(), key=lambda row: row[query["$orderby"]])
+        if "$filter" in query:
+            field, operator, since = query["$filter"].split(" ", 2)
+            assert (field, operator) == ("Date", "gt")
+            rows = [row for row in rows if pd.Timestamp(row["Date"]) > pd.Timestamp(since)]
+        skip, top = int(query.get("$skip", 0)), int(query["$top"])
+        body = json.dumps({"@odata.context": self.server.context,
+                           "value": rows[skip:skip + top]}).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _GHOServer(ThreadingHTTPServer):
+    """Stand-in GHO server; publish() adds or revises rows by Id."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _GHOHandler)
+        recorded = _recorded("gho_WHOSIS_000001.json")
+        self.context = recorded["@odata.context"]
+        self.rows = {}
+        self.queries = []
+        self.publish(recorded["value"])
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}{ENDPOINT}"
+
+    def publish(self, rows) -> None:
+        self.rows.update({row["Id"]: row for row in rows})
+
+
+@pytest.fixture(name="gho")
+def fixture_gho():
+    server = _GHOServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("page_size, skips", [(3, [0, 3, 6]), (7, [0, 7]), (50, [0])])
+def test_full_download_is_paged(gho, tmp_path, page_size, skips):
+    raw_csv = tmp_path / "raw.csv"
+
+    assert ingest_raw_data(gho.url, raw_csv, page_size=page_size) == 7
+
+    assert [int(query["$skip"]) for query in gho.queries] == skips
+    assert all(int(query["$top"]) == page_size for query in gho.queries)
+    assert not any("$filter" in query for query in gho.queries)
+    stored = pd.read_csv(raw_csv)
+    assert stored["Id"].tolist() == sorted(gho.rows)
+    assert stored["Id"].is_unique
+
+
+def test_update_fetches_newer_rows_and_merges_them_by_id(gho, tmp_path):
+    raw_csv = tmp_path / "raw.csv"
+    ingest_raw_data(gho.url, raw_csv, page_size=3)
+    before = pd.read_csv(raw_csv).set_index("Id")
+    update = _recorded("gho_WHOSIS_000001_update.json")["value"]
+    revised, added = update
+    gho.publish(update)
+    gho.queries.clear()
+
+    assert ingest_raw_data(gho.url, raw_csv, page_size=3) == 2
+
+    # Only rows newer than the newest stored Date are requested
+    latest = before["Date"].max()
+    assert [query.get("$filter") for query in gho.queries] == [f"Date gt {latest}"]
+    after = pd.read_csv(raw_csv).set_index("Id")
+    assert len(after) == len(before) + 1
+    assert after.index.is_unique
+    assert after.loc[revised["Id"], "NumericValue"] == revised["NumericValue"]
+    assert after.loc[revised["Id"], "Date"] == revised["Date"]
+    assert after.loc[added["Id"], "TimeDim"] == added["TimeDim"]
+    unchanged = before.index.difference([revised["Id"]])
+    pd.testing.assert_frame_equal(after.loc[unchanged], before.loc[unchanged])
+
+
+def test_update_without_new_rows_leaves_the_store_unchanged(gho, tmp_path):
+    raw_csv = tmp_path / "raw.csv"
+    ingest_raw_data(gho.url, raw_csv)
+    content = raw_csv.read_bytes()
+
+    assert ingest_raw_data(gho.url, raw_csv) == 0
+    assert raw_csv.read_bytes() == content
+
+
+def test_failed_request_raises_and_keeps_the_store(gho, tmp_path):
+    raw_csv = tmp_path / "raw.csv"
+    ingest_raw_data(gho.url, raw_csv)
+    content = raw_csv.read_bytes()
+
+    with pytest.raises(requests.HTTPError):
+        ingest_raw_data(gho.url.replace("WHOSIS", "UNKNOWN"), raw_csv)
+    assert raw_csv.read_bytes() == content
+
+
+def test_odata_values_are_parsed_across_chunks():
+    recorded = _recorded("gho_WHOSIS_000001.json")
+    text = json.dumps(recorded)
+
+    chunks = (text[i:i + 7] for i in range(0, len(text), 7))
+    assert list(iter_odata_values(chunks)) == recorded["value"]
+
+    with pytest.raises(ValueError):
+        list(iter_odata_values([text[:len(text) // 2]]))
@@ -0,0 +1,24 @@
+"""
+Production WSGI entry point for the Life Expectancy Dashboard.
+
+Importing this module loads the data, geometry and page layouts, warms the
+map render cache and freezes the garbage collector, so that with a
+pre-forking server (gunicorn with preload_app) all of it is loaded once in
+the master and shared copy-on-write by the workers.
+
+Usage: gunicorn -c gunicorn.conf.py wsgi:server
+"""
+
+import gc
+
+from main import app, warm_pages
+
+# Page modules load their data lazily; load it here, before the fork
+warm_pages()
+
+# Keep the preloaded objects out of future GC passes: collections in the
+# workers would otherwise touch (and copy) the pages shared with the master.
+gc.collect()
+gc.freeze()
+
+server = app.server